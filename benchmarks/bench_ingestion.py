@@ -0,0 +1,56 @@
+"""Throughput of the async inventory client against the bundled stand-in server.
+
+    python benchmarks/bench_ingestion.py --products 200000 --concurrency 1 8 32 128
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'replenishment_ordering_system' / 'inventory_ingestion'))
+from inventory_client import fetch_inventory_snapshot
+from stand_in_server import running_server
+
+async def run_benchmark(n_products, page_size, concurrency_levels, latency_ms, failure_rate, retries, repeat):
+    rows = []
+    async with running_server(n_products=n_products, latency_ms=latency_ms, failure_rate=failure_rate) as url:
+        for concurrency in concurrency_levels:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                snapshot = await fetch_inventory_snapshot(url, page_size=page_size, max_connections=concurrency,
+                                                          retries=retries, backoff=0.01)
+                best = min(best, time.perf_counter() - start)
+            pages = -(-n_products // page_size)
+            rows.append({
+                'concurrency': concurrency,
+                'seconds': round(best, 3),
+                'pages/s': round(pages / best, 1),
+                'snapshots/s': round(len(snapshot) / best),
+            })
+    return pd.DataFrame(rows)
+
+def main(argv=None):
+    """Main function to run the ingestion benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the async inventory client.')
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--latency-ms', type=float, default=20, help='simulated server latency per page')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_benchmark(args.products, args.page_size, args.concurrency, args.latency_ms,
+                                        args.failure_rate, args.retries, args.repeat))
+    print(f"Inventory snapshot: {args.products} SKUs, {args.page_size} per page, "
+          f"{args.latency_ms:g} ms latency, {args.failure_rate:.0%} failures")
+    print(results.to_string(index=False))
+    return results
+
+if __name__ == "__main__":
+    main()
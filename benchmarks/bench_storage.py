@@ -0,0 +1,94 @@
+"""Read / write benchmark of the partitioned Parquet store against the current CSV path.
+
+    python benchmarks/bench_storage.py --products 5000 --weeks 104
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import SALES_HISTORY, apply_schema
+from common.storage import read_dataset, write_dataset
+from synthetic_data import make_history
+
+def timed(func, repeat):
+    """Best wall time of ``repeat`` runs and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def directory_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+def run_benchmark(n_products, n_weeks, n_shards, repeat, work_dir):
+    history = make_history(n_products, n_weeks)
+    csv_path = Path(work_dir) / 'demand_history.csv'
+    parquet_path = Path(work_dir) / 'demand_history'
+    last_weeks = history['week'].sort_values().unique()[-8:]
+    some_products = history['product_id'].cat.categories[:10].tolist()
+    columns = ['product_id', 'week', 'sales']
+
+    def csv_slice():
+        df = pd.read_csv(csv_path, parse_dates=['week'])
+        df = df[(df['week'] >= last_weeks[0]) & df['product_id'].isin(some_products)]
+        return df[columns]
+
+    cases = [
+        ('write', 'csv', lambda: history.to_csv(csv_path, index=False)),
+        ('write', 'parquet', lambda: write_dataset(history, parquet_path, n_shards=n_shards)),
+        ('full read', 'csv', lambda: apply_schema(pd.read_csv(csv_path), SALES_HISTORY, copy=False)),
+        ('full read', 'parquet', lambda: read_dataset(parquet_path, schema=SALES_HISTORY, n_shards=n_shards)),
+        ('3 columns', 'csv', lambda: pd.read_csv(csv_path, usecols=columns)),
+        ('3 columns', 'parquet', lambda: read_dataset(parquet_path, columns=columns, n_shards=n_shards)),
+        ('8 weeks x 10 SKUs', 'csv', csv_slice),
+        ('8 weeks x 10 SKUs', 'parquet', lambda: read_dataset(
+            parquet_path, columns=columns, start_week=last_weeks[0], products=some_products, n_shards=n_shards)),
+    ]
+
+    rows = []
+    for case, fmt, func in cases:
+        seconds, result = timed(func, repeat)
+        rows.append({
+            'case': case,
+            'format': fmt,
+            'seconds': round(seconds, 4),
+            'rows': len(result) if isinstance(result, pd.DataFrame) else len(history),
+        })
+    results = pd.DataFrame(rows)
+    results['speedup vs csv'] = (results.groupby('case')['seconds'].transform('first') / results['seconds']).round(1)
+    sizes = {'csv': directory_size(csv_path), 'parquet': directory_size(parquet_path)}
+    return results, sizes
+
+def main(argv=None):
+    """Main function to run the storage benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the Parquet store against CSV.')
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--weeks', type=int, default=104)
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_storage_')
+    try:
+        results, sizes = run_benchmark(args.products, args.weeks, args.shards, args.repeat, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"Demand history: {args.products} products x {args.weeks} weeks, {args.shards} SKU shards")
+    print(results.to_string(index=False))
+    print(f"\nOn disk: csv {sizes['csv'] / 1e6:.1f} MB, parquet {sizes['parquet'] / 1e6:.1f} MB")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Hot paths measured by ``run_benchmarks.py``.
+
+Each case builds its inputs once per size (untimed), gets a fresh copy of them per run
+(``prepare``, untimed) and times ``run``. ``max_size`` caps the sizes a case runs at: the
+per-product Python loops of the forecast script cannot reach a million SKUs in a
+benchmark run, so they are measured up to their cap (or at the cap when every profile
+size is above it).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+from common.script_loader import load_script
+from synthetic_data import make_history, make_inventory, make_network, make_stock_input
+
+forecast_module = load_script(REPO_ROOT / 'demand_planning' / 'demand_fcst_models_random_data',
+                              'demand_fcst_models_random_data')
+stock_module = load_script(REPO_ROOT / 'replenishment_ordering_system' / 'short_shelf_skus' / 'Code_and_logic.py',
+                           'Code_and_logic')
+dashboard_module = load_script(REPO_ROOT / 'replenishment_ordering_system' / 'User_Interface_Visual' / 'user_interface.py',
+                               'user_interface')
+network_module = load_script(REPO_ROOT / 'network_design' / 'supply_chain_current_design_ecommerce_asia.py',
+                             'supply_chain_current_design_ecommerce_asia')
+
+N_WEEKS = 52
+
+class BenchmarkCase:
+    """One measured hot path; ``dimension`` is 'skus' or 'routes'."""
+
+    def __init__(self, name, dimension, setup, run, max_size=None, prepare=None):
+        self.name = name
+        self.dimension = dimension
+        self.setup = setup
+        self.run = run
+        self.max_size = max_size
+        self.prepare = prepare or _copy_frames
+
+    def sizes(self, profile_sizes):
+        """Profile sizes this case runs at, or its cap alone if they are all above it."""
+        if self.max_size is None:
+            return list(profile_sizes)
+        sizes = [size for size in profile_sizes if size <= self.max_size]
+        return sizes or [self.max_size]
+
+def _copy_frames(data):
+    """Fresh copy of the inputs so functions that add columns start from the same frame."""
+    return tuple(item.copy() if isinstance(item, pd.DataFrame) else item for item in data)
+
+def _series_per_product(n_products):
+    history = make_history(n_products, N_WEEKS)
+    sales = history['sales'].to_numpy().reshape(n_products, N_WEEKS)
+    promo = history['promotion'].to_numpy().reshape(n_products, N_WEEKS)
+    return (sales, promo)
+
+def _run_per_series(method):
+    def run(sales, promo):
+        for i in range(len(sales)):
+            method(sales[i], promo[i])
+    return run
+
+def _forecast_frame(n_products):
+    history = make_history(n_products, N_WEEKS)
+    rng = np.random.default_rng(0)
+    for column in forecast_module.FORECAST_COLUMNS:
+        history[column] = (history['sales'] * rng.uniform(0.8, 1.2, len(history))).astype('float32')
+    return (history,)
+
+def _mape_arrays(n_products):
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(80, 300, n_products * N_WEEKS).astype(np.float64)
+    return (y_true, y_true * rng.uniform(0.8, 1.2, len(y_true)))
+
+def _basic_metrics_output(n_products):
+    return (stock_module.calculate_basic_inventory_metrics(make_stock_input(n_products)),)
+
+def _inventory_metrics_output(n_products):
+    return (dashboard_module.calculate_inventory_metrics(make_inventory(n_products)),)
+
+def _render_html(obj):
+    """HTML a notebook front-end would render for a displayed object."""
+    if hasattr(obj, 'to_html'):
+        # Styler tables and plotly figures
+        if hasattr(obj, 'to_plotly_json'):
+            return obj.to_html(full_html=False, include_plotlyjs=False)
+        return obj.to_html()
+    if hasattr(obj, '_repr_html_'):
+        return obj._repr_html_()
+    return repr(obj)
+
+def _render_dashboard(df):
+    """Run display_dashboard with every displayed object rendered to HTML.
+
+    Outside IPython ``display`` only prints a repr, which would leave the table and
+    charts unrendered.
+    """
+    rendered = []
+    display = dashboard_module.display
+    dashboard_module.display = lambda *objs, **kwargs: rendered.extend(_render_html(obj) for obj in objs)
+    try:
+        dashboard_module.display_dashboard(df)
+    finally:
+        dashboard_module.display = display
+    return sum(len(html) for html in rendered)
+
+CASES = [
+    BenchmarkCase(
+        'forecast.moving_avg', 'skus', _series_per_product,
+        _run_per_series(lambda sales, promo: forecast_module.moving_avg_fcst(pd.Series(sales))),
+        max_size=10_000),
+    BenchmarkCase(
+        'forecast.exp_smoothing', 'skus', _series_per_product,
+        _run_per_series(lambda sales, promo: forecast_module.exp_smoothing(pd.Series(sales))),
+        max_size=10_000),
+    BenchmarkCase(
+        'forecast.no_promo_3wk_moving_avg', 'skus', _series_per_product,
+        _run_per_series(lambda sales, promo: forecast_module.no_promo_3wk_moving_avg(pd.Series(sales), pd.Series(promo))),
+        max_size=100),
+    BenchmarkCase(
+        'forecast.linear_regression', 'skus', _series_per_product,
+        _run_per_series(forecast_module.linear_regression_fcst),
+        max_size=20),
+    BenchmarkCase(
+        'forecast.calculate_mape', 'skus', _forecast_frame,
+        forecast_module.calculate_mape,
+        max_size=1_000),
+    BenchmarkCase(
+        'forecast.mape', 'skus', _mape_arrays,
+        forecast_module.mape,
+        max_size=100_000),
+    BenchmarkCase(
+        'replenishment.calculate_basic_inventory_metrics', 'skus', lambda n: (make_stock_input(n),),
+        stock_module.calculate_basic_inventory_metrics),
+    BenchmarkCase(
+        'replenishment.calculate_target_inventory', 'skus', _basic_metrics_output,
+        stock_module.calculate_target_inventory),
+    BenchmarkCase(
+        'replenishment.calculate_inventory_metrics', 'skus', lambda n: (make_inventory(n),),
+        dashboard_module.calculate_inventory_metrics),
+    BenchmarkCase(
+        'replenishment.display_dashboard', 'skus', _inventory_metrics_output,
+        _render_dashboard,
+        max_size=10_000),
+    BenchmarkCase(
+        'network.create_supply_chain_map_html', 'routes', make_network,
+        lambda facilities, routes: network_module.create_supply_chain_map(facilities, routes).get_root().render(),
+        prepare=lambda data: data),
+]
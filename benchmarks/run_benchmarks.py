@@ -0,0 +1,218 @@
+"""Benchmark suite: runtime and peak memory of the hot paths at several data sizes.
+
+Runs offline on synthetic data, prints scaling curves (with the fitted log-log slope of
+runtime against size), and compares every measurement with the stored baselines. The run
+exits with status 1 when a case got slower or bigger than its baseline by more than the
+threshold, or has no baseline to compare with (unless ``--allow-missing``).
+
+    python benchmarks/run_benchmarks.py                        # quick profile, compare
+    python benchmarks/run_benchmarks.py --profile full --plot curves.html
+    python benchmarks/run_benchmarks.py --save-baseline        # record new baselines
+
+Baselines are timings of one machine; record them on the machine that runs the comparison.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from cases import CASES
+
+PROFILES = {
+    'quick': {'skus': [1_000], 'routes': [50]},
+    'medium': {'skus': [1_000, 100_000], 'routes': [50, 500]},
+    'full': {'skus': [1_000, 100_000, 1_000_000], 'routes': [50, 500, 5_000]},
+}
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baselines.json'
+
+def measure(case, size, repeat):
+    """Best runtime over ``repeat`` runs after a warm-up run, then peak traced memory of one more run."""
+    data = case.setup(size)
+    best = float('inf')
+    # The scripts print debug tables; keep them out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        case.run(*case.prepare(data))
+        for _ in range(repeat):
+            args = case.prepare(data)
+            start = time.perf_counter()
+            case.run(*args)
+            best = min(best, time.perf_counter() - start)
+
+        # Memory is measured separately since tracing slows the run down
+        args = case.prepare(data)
+        tracemalloc.start()
+        try:
+            start_memory = tracemalloc.get_traced_memory()[0]
+            case.run(*args)
+            peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+        finally:
+            tracemalloc.stop()
+    return {'seconds': best, 'peak_memory_bytes': int(peak_memory)}
+
+def run_suite(profile, case_filter=None, repeat=5):
+    rows = []
+    for case in CASES:
+        if case_filter and not any(pattern in case.name for pattern in case_filter):
+            continue
+        for size in case.sizes(PROFILES[profile][case.dimension]):
+            result = measure(case, size, repeat)
+            rows.append({'case': case.name, 'dimension': case.dimension, 'size': size, **result})
+            print(f"{case.name:<50} {case.dimension:>6}={size:<9,} "
+                  f"{result['seconds']:>10.4f} s {result['peak_memory_bytes'] / 1e6:>10.1f} MB", flush=True)
+    return pd.DataFrame(rows)
+
+def scaling_summary(results):
+    """Log-log slope of runtime against size per case (1 = linear, 2 = quadratic)."""
+    rows = []
+    for case, group in results.groupby('case', sort=False):
+        slope = np.nan
+        if group['size'].nunique() > 1:
+            slope = np.polyfit(np.log(group['size']), np.log(group['seconds']), 1)[0]
+        rows.append({
+            'case': case,
+            'sizes': ', '.join(f'{size:,}' for size in group['size']),
+            'seconds': ', '.join(f'{seconds:.4f}' for seconds in group['seconds']),
+            'scaling exponent': round(slope, 2),
+        })
+    return pd.DataFrame(rows)
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return {'meta': {}, 'results': {}}
+    return json.loads(path.read_text())
+
+def save_baseline(results, path, profile):
+    """Merge ``results`` into the baseline file (other cases and sizes are kept)."""
+    baseline = load_baseline(path)
+    for row in results.itertuples(index=False):
+        baseline['results'].setdefault(row.case, {})[str(row.size)] = {
+            'seconds': round(row.seconds, 6),
+            'peak_memory_bytes': row.peak_memory_bytes,
+        }
+    baseline['meta'] = {
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'profile': profile,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+    return path
+
+def missing_baselines(results, baseline):
+    """(case, size) pairs of ``results`` the baseline has no measurement for."""
+    return [(row.case, row.size) for row in results.itertuples(index=False)
+            if str(row.size) not in baseline['results'].get(row.case, {})]
+
+def find_regressions(results, baseline, threshold=0.5, memory_threshold=0.25, min_delta_seconds=0.05,
+                     min_delta_bytes=1_000_000):
+    """Cases slower / bigger than baseline by more than the thresholds.
+
+    Increases under ``min_delta_seconds`` / ``min_delta_bytes`` are ignored, since timer and
+    allocator noise dominates there.
+    """
+    regressions = []
+    for row in results.itertuples(index=False):
+        reference = baseline['results'].get(row.case, {}).get(str(row.size))
+        if reference is None:
+            continue
+        seconds_ratio = row.seconds / reference['seconds'] if reference['seconds'] else np.inf
+        memory_ratio = (row.peak_memory_bytes / reference['peak_memory_bytes']
+                        if reference['peak_memory_bytes'] else 1.0)
+        if seconds_ratio > 1 + threshold and row.seconds - reference['seconds'] > min_delta_seconds:
+            regressions.append({'case': row.case, 'size': row.size, 'metric': 'seconds',
+                                'baseline': reference['seconds'], 'current': round(row.seconds, 6),
+                                'ratio': round(seconds_ratio, 2)})
+        if (memory_ratio > 1 + memory_threshold
+                and row.peak_memory_bytes - reference['peak_memory_bytes'] > min_delta_bytes):
+            regressions.append({'case': row.case, 'size': row.size, 'metric': 'peak_memory_bytes',
+                                'baseline': reference['peak_memory_bytes'], 'current': row.peak_memory_bytes,
+                                'ratio': round(memory_ratio, 2)})
+    return pd.DataFrame(regressions)
+
+def plot_scaling_curves(results, path):
+    """Log-log runtime and peak memory curves per case as one HTML file."""
+    import plotly.express as px
+
+    with open(path, 'w') as f:
+        for metric, title in [('seconds', 'Runtime (s)'), ('peak_memory_bytes', 'Peak memory (bytes)')]:
+            for dimension, group in results.groupby('dimension'):
+                fig = px.line(group, x='size', y=metric, color='case', markers=True, log_x=True, log_y=True,
+                              title=f'{title} by number of {dimension}')
+                f.write(fig.to_html(full_html=False, include_plotlyjs='cdn'))
+    return path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and check for regressions.')
+    parser.add_argument('--profile', choices=list(PROFILES), default='quick')
+    parser.add_argument('--cases', nargs='+', help='only run cases whose name contains one of these')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--save-baseline', action='store_true', help='record this run as the baseline')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='pass when cases or sizes have no baseline (exploratory runs)')
+    parser.add_argument('--threshold', type=float, default=0.5, help='allowed runtime increase (0.5 = +50%%)')
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help='allowed peak memory increase')
+    parser.add_argument('--min-delta', type=float, default=0.05, help='ignore runtime increases below this (s)')
+    parser.add_argument('--min-memory-delta', type=int, default=1_000_000,
+                        help='ignore peak memory increases below this (bytes)')
+    parser.add_argument('--output', help='write the measurements to this .csv or .json file')
+    parser.add_argument('--plot', help='write scaling curves to this HTML file')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main function to run the benchmarks; returns the process exit code."""
+    args = parse_args(argv)
+    results = run_suite(args.profile, args.cases, args.repeat)
+
+    print("\nScaling:")
+    print(scaling_summary(results).to_string(index=False))
+
+    if args.output:
+        if args.output.endswith('.json'):
+            results.to_json(args.output, orient='records', indent=2)
+        else:
+            results.to_csv(args.output, index=False)
+    if args.plot:
+        plot_scaling_curves(results, args.plot)
+        print(f"\nScaling curves saved to: {args.plot}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline, args.profile)
+        print(f"\nBaseline saved to: {args.baseline}")
+        return 0
+
+    if not Path(args.baseline).exists():
+        print(f"\nBaseline file {args.baseline} does not exist (record it with --save-baseline)")
+        return 0 if args.allow_missing else 1
+    baseline = load_baseline(args.baseline)
+    missing = missing_baselines(results, baseline)
+    if missing:
+        print("\nNo baseline yet (record it with --save-baseline): "
+              + ', '.join(f'{case} at {size:,}' for case, size in missing))
+    regressions = find_regressions(results, baseline, args.threshold, args.memory_threshold, args.min_delta,
+                                   args.min_memory_delta)
+    if len(regressions):
+        print("\nRegressions beyond the threshold:")
+        print(regressions.to_string(index=False, float_format='{:.6g}'.format))
+        return 1
+    if missing and not args.allow_missing:
+        return 1
+    checked = len(results) - len(missing)
+    print(f"\nNo regressions in {checked} measurement(s) against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Vectorised synthetic inputs for the benchmarks, shaped like each script's own sample data."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import INVENTORY_SNAPSHOT, SALES_HISTORY, STOCK_INPUT, apply_schema
+
+FACILITY_TYPES = ['supplier', 'main_dc', 'port', 'regional_dc', 'fulfillment']
+ROUTE_TYPES = {
+    'supplier_to_main': ('supplier', 'main_dc'),
+    'shenzhen_to_port': ('supplier', 'port'),
+    'port_to_regional': ('port', 'regional_dc'),
+    'main_to_regional': ('main_dc', 'regional_dc'),
+    'regional_to_fc': ('regional_dc', 'fulfillment'),
+    'main_to_fc': ('main_dc', 'fulfillment'),
+}
+
+def make_history(n_products, n_weeks, seed=42):
+    """Sales history in the forecast script's layout (product_id, week, promotion, sales)."""
+    rng = np.random.default_rng(seed)
+    weeks = pd.date_range(start='2024-01-01', periods=n_weeks, freq='W-MON')
+    products = [f'Product_{i+1}' for i in range(n_products)]
+    base = rng.integers(80, 120, n_products)
+    sales = np.repeat(base, n_weeks) + rng.integers(-20, 20, n_products * n_weeks)
+    return apply_schema(pd.DataFrame({
+        'product_id': np.repeat(products, n_weeks),
+        'week': np.tile(weeks, n_products),
+        'promotion': rng.choice([0, 1], n_products * n_weeks, p=[0.8, 0.2]),
+        'sales': sales,
+    }), SALES_HISTORY, copy=False)
+
+def make_stock_input(n_products, seed=42):
+    """Input of the safety / target stock logic, like ``create_inventory_data``."""
+    rng = np.random.default_rng(seed)
+    return apply_schema(pd.DataFrame({
+        'Product': [f'Product_{i+1}' for i in range(n_products)],
+        'Daily Demand': rng.integers(5, 60, n_products),
+        'Std Demand Forecast': rng.integers(1, 10, n_products),
+        'Lead Time': rng.integers(3, 30, n_products),
+        'Review Time': np.full(n_products, 7),
+        'Z-score': np.full(n_products, 1.96),
+    }), STOCK_INPUT, copy=False)
+
+def make_inventory(n_products, seed=42):
+    """Inventory snapshot like ``create_sample_data`` in the dashboard."""
+    rng = np.random.default_rng(seed)
+    target = rng.integers(100, 800, n_products)
+    sellable = (target * rng.uniform(0.5, 1.1, n_products)).astype(int)
+    return apply_schema(pd.DataFrame({
+        'product_id': [f'P{i+1:07d}' for i in range(n_products)],
+        'inventory_id': [f'INV{i+1:07d}' for i in range(n_products)],
+        'abc_sku': rng.choice(['A', 'B', 'C'], n_products, p=[0.2, 0.3, 0.5]),
+        'target_inventory': target,
+        'sellable_inventory': sellable,
+        'available_inventory': (sellable * rng.uniform(0.85, 1.0, n_products)).astype(int),
+        'daily_demand': rng.integers(5, 40, n_products),
+        'lead_time': rng.integers(3, 11, n_products),
+        'shelf_life_days': np.full(n_products, 22),
+        'last_order_date': pd.Timestamp('2024-12-23') - pd.to_timedelta(rng.integers(1, 11, n_products), unit='D'),
+    }), INVENTORY_SNAPSHOT, copy=False)
+
+def make_network(n_routes, seed=42):
+    """Facilities and routes in ``create_supply_chain_map``'s format with ``n_routes`` routes.
+
+    Roughly one facility per two routes, spread over the types and the Asia-Pacific map.
+    """
+    rng = np.random.default_rng(seed)
+    per_type = max(2, n_routes // (2 * len(FACILITY_TYPES)))
+    facilities = {}
+    names_by_type = {}
+    for facility_type in FACILITY_TYPES:
+        names = [f'{facility_type} {i+1}' for i in range(per_type)]
+        names_by_type[facility_type] = names
+        for name in names:
+            facilities[name] = {
+                'lat': float(rng.uniform(20, 40)),
+                'lng': float(rng.uniform(110, 142)),
+                'type': facility_type,
+                'capacity': str(rng.choice(['High', 'Medium'])),
+            }
+
+    route_types = list(ROUTE_TYPES)
+    routes = []
+    for i in range(n_routes):
+        route_type = route_types[i % len(route_types)]
+        from_type, to_type = ROUTE_TYPES[route_type]
+        routes.append({
+            'from': str(rng.choice(names_by_type[from_type])),
+            'to': str(rng.choice(names_by_type[to_type])),
+            'type': route_type,
+            'volume': str(rng.choice(['High', 'Medium', 'Low'])),
+        })
+    return facilities, routes
@@ -0,0 +1 @@
+"""Shared helpers used by the demand planning, replenishment and network design scripts."""
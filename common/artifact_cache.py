@@ -0,0 +1,74 @@
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+def hash_frame(df):
+    """Return a content hash of a DataFrame (values, index and column names)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(column) for column in df.columns]).encode())
+    digest.update(json.dumps([str(dtype) for dtype in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+def hash_file(path):
+    """Return the sha256 of a file's bytes."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def stage_key(stage_name, params=None, inputs=None, sources=None):
+    """Build the cache key of a stage from its parameters, input frames and source files."""
+    payload = {
+        'stage': stage_name,
+        'params': params or {},
+        'inputs': {name: hash_frame(df) for name, df in (inputs or {}).items()},
+        'sources': {Path(path).name: hash_file(path) for path in (sources or [])},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+class ArtifactCache:
+    """Store stage outputs on disk under the hash of their inputs and parameters."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, stage_name, key):
+        stage_dir = self.cache_dir / stage_name
+        return stage_dir / f'{key}.pkl', stage_dir / f'{key}.json'
+
+    def load(self, stage_name, key):
+        """Return the cached frame for a stage key, or None if it was never computed."""
+        data_path, _ = self._paths(stage_name, key)
+        if not data_path.exists():
+            return None
+        return pd.read_pickle(data_path)
+
+    def save(self, stage_name, key, df, params=None):
+        """Persist a stage output together with a small manifest describing it."""
+        data_path, manifest_path = self._paths(stage_name, key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_pickle(data_path)
+        manifest = {
+            'stage': stage_name,
+            'key': key,
+            'params': params or {},
+            'rows': len(df),
+            'content_hash': hash_frame(df),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2, default=str))
+        return data_path
+
+    def run_stage(self, stage_name, compute, params=None, inputs=None, sources=None, force=False):
+        """Return (frame, was_cached), recomputing the stage only when its key is stale."""
+        key = stage_key(stage_name, params, inputs, sources)
+        if not force:
+            cached = self.load(stage_name, key)
+            if cached is not None:
+                return cached, True
+        df = compute()
+        self.save(stage_name, key, df, params)
+        return df, False
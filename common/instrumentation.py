@@ -0,0 +1,240 @@
+"""Opt-in timing, peak memory and row counters for the supply chain scripts.
+
+Nothing is measured unless instrumentation is enabled, either with ``enable()`` or by
+setting ``SUPPLY_CHAIN_METRICS`` to the metrics log path (``.jsonl``, ``.json`` or
+``.csv``). When disabled, ``stage()`` hands back a shared no-op context manager and
+``timed`` wrappers call straight through, so the scripts pay one flag check per call.
+
+    from common import instrumentation
+
+    with instrumentation.stage('forecast', subsystem='demand_planning') as s:
+        df = apply_forecasts(df)
+        s.count('rows', len(df))
+"""
+import argparse
+import atexit
+import csv
+import functools
+import json
+import os
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ENV_VAR = 'SUPPLY_CHAIN_METRICS'
+
+_enabled = False
+_output_path = None
+_run_id = None
+_records = []
+_open_stages = []
+_started_tracemalloc = False
+
+class _NullStage:
+    """Stage returned while instrumentation is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def count(self, name, value=1):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """Measures wall time, peak traced memory and counters between enter and exit."""
+
+    def __init__(self, name, subsystem):
+        self.name = name
+        self.subsystem = subsystem
+        self.counters = {}
+
+    def count(self, name, value=1):
+        """Add ``value`` to the counter ``name`` of this stage."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self):
+        # Carry the peak seen so far into the enclosing stages before resetting it
+        current, peak = tracemalloc.get_traced_memory()
+        for parent in _open_stages:
+            parent.peak_seen = max(parent.peak_seen, peak)
+        tracemalloc.reset_peak()
+        self.start_memory = current
+        self.peak_seen = current
+        _open_stages.append(self)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start_time
+        _, peak = tracemalloc.get_traced_memory()
+        _open_stages.remove(self)
+        for parent in _open_stages:
+            parent.peak_seen = max(parent.peak_seen, peak)
+        _records.append({
+            'run_id': _run_id,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'subsystem': self.subsystem,
+            'stage': self.name,
+            'duration_s': round(duration, 6),
+            'peak_memory_bytes': max(self.peak_seen, peak) - self.start_memory,
+            'status': 'error' if exc_type else 'ok',
+            'counters': dict(self.counters),
+        })
+        return False
+
+def enable(output_path=None):
+    """Turn instrumentation on; records are written to ``output_path`` at exit if given."""
+    global _enabled, _output_path, _run_id, _started_tracemalloc
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _enabled = True
+    _output_path = Path(output_path) if output_path else None
+    _run_id = uuid.uuid4().hex[:12]
+
+def disable():
+    """Turn instrumentation off and stop tracemalloc if it was started here."""
+    global _enabled, _started_tracemalloc
+    _enabled = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+def is_enabled():
+    return _enabled
+
+def stage(name, subsystem=None):
+    """Context manager measuring one stage; a no-op when instrumentation is disabled."""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, subsystem)
+
+def timed(name=None, subsystem=None):
+    """Decorator form of ``stage()``, named after the function unless ``name`` is given."""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, subsystem):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    """Add to a counter of the innermost open stage (ignored outside a stage or when disabled)."""
+    if _enabled and _open_stages:
+        _open_stages[-1].count(name, value)
+
+def records():
+    """Return a copy of the records collected so far."""
+    return list(_records)
+
+def reset():
+    """Drop the collected records."""
+    _records.clear()
+
+def _flatten(record):
+    row = {key: value for key, value in record.items() if key != 'counters'}
+    for name, value in record['counters'].items():
+        row[f'count_{name}'] = value
+    return row
+
+def write_metrics(path=None):
+    """Write collected records to ``path`` as JSON lines, a JSON list or CSV (by suffix).
+
+    ``.jsonl`` and ``.csv`` logs accumulate runs (a CSV is rewritten with the union of the
+    counter columns of all runs); a ``.json`` log holds the current run only. Written
+    records are dropped, so a later call (or the exit hook) only adds new ones.
+    """
+    path = Path(path) if path else _output_path
+    if path is None or not _records:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.csv':
+        rows = load_metrics(path) if path.exists() else []
+        rows.extend(_flatten(record) for record in _records)
+        fieldnames = []
+        for row in rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif path.suffix == '.json':
+        # Keep what this run wrote earlier, replace anything from previous runs
+        earlier = json.loads(path.read_text()) if path.exists() else []
+        records = [record for record in earlier if record.get('run_id') == _run_id] + _records
+        path.write_text(json.dumps(records, indent=2))
+    else:
+        with open(path, 'a') as f:
+            for record in _records:
+                f.write(json.dumps(record) + '\n')
+    _records.clear()
+    return path
+
+def load_metrics(path):
+    """Read a metrics log written by ``write_metrics`` into a list of flat dicts."""
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path, newline='') as f:
+            return [dict(row) for row in csv.DictReader(f)]
+    if path.suffix == '.json':
+        return [_flatten(record) for record in json.loads(path.read_text())]
+    with open(path) as f:
+        return [_flatten(json.loads(line)) for line in f if line.strip()]
+
+def diff_metrics(baseline_path, current_path):
+    """Compare the last run of two metrics logs stage by stage.
+
+    Returns rows with the baseline and current duration / peak memory and their ratio.
+    """
+    def last_run(rows):
+        run_id = rows[-1]['run_id'] if rows else None
+        return {(row['subsystem'], row['stage']): row for row in rows if row['run_id'] == run_id}
+
+    baseline = last_run(load_metrics(baseline_path))
+    current = last_run(load_metrics(current_path))
+    diff_rows = []
+    for key in sorted(set(baseline) | set(current), key=lambda k: (str(k[0]), k[1])):
+        row = {'subsystem': key[0], 'stage': key[1]}
+        for metric in ('duration_s', 'peak_memory_bytes'):
+            old = float(baseline[key][metric]) if key in baseline else None
+            new = float(current[key][metric]) if key in current else None
+            row[f'{metric}_baseline'] = old
+            row[f'{metric}_current'] = new
+            row[f'{metric}_ratio'] = round(new / old, 3) if old and new is not None else None
+        diff_rows.append(row)
+    return diff_rows
+
+@atexit.register
+def _write_at_exit():
+    if _enabled and _output_path is not None:
+        write_metrics()
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
+
+def main(argv=None):
+    """Print a stage-by-stage comparison of two metrics logs."""
+    parser = argparse.ArgumentParser(description='Diff two instrumentation metrics logs.')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    args = parser.parse_args(argv)
+
+    columns = ['subsystem', 'stage', 'duration_s_baseline', 'duration_s_current', 'duration_s_ratio',
+               'peak_memory_bytes_baseline', 'peak_memory_bytes_current', 'peak_memory_bytes_ratio']
+    print('\t'.join(columns))
+    for row in diff_metrics(args.baseline, args.current):
+        print('\t'.join('' if row[column] is None else str(row[column]) for column in columns))
+
+if __name__ == "__main__":
+    main()
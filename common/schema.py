@@ -0,0 +1,191 @@
+"""Typed column schemas shared by the demand planning and replenishment frames.
+
+Ids are categoricals, weeks are ``datetime64`` and numbers are downcast to int32 /
+float32 (int16 for day counts). Values that would not survive the cast (fractions in an
+integer column, numbers out of range, text in a numeric column) raise ``SchemaError``.
+Settings that hold for a whole frame (shelf life) are kept once in ``df.attrs`` rather
+than repeated on every row, and joined back in as columns only for printing and files.
+
+    df = apply_schema(df, SALES_HISTORY)   # cast and validate (returns a copy)
+    check_schema(df, SALES_HISTORY)        # validate only (frames handed between stages)
+"""
+import numpy as np
+import pandas as pd
+
+ID = 'category'
+WEEK = 'datetime64[ns]'
+DATE = 'datetime64[ns]'
+FLAG = 'int8'
+DAYS = 'int16'
+COUNT = 'int32'
+QUANTITY = 'float32'
+
+SETTINGS_ATTR = 'settings'
+
+class SchemaError(ValueError):
+    """Raised when a frame is missing columns or a column cannot take its schema dtype."""
+
+class Schema:
+    """Named mapping of column -> dtype; ``required`` columns must be present."""
+
+    def __init__(self, name, columns, required=None):
+        self.name = name
+        self.columns = dict(columns)
+        self.required = list(required) if required is not None else list(columns)
+
+    def extend(self, name, columns, required=None):
+        """Return a new schema with extra (optional unless listed in ``required``) columns."""
+        merged = dict(self.columns)
+        merged.update(columns)
+        return Schema(name, merged, self.required + list(required or []))
+
+    def select(self, columns):
+        """Return the schema restricted to ``columns`` (used for projected reads)."""
+        return Schema(self.name, {c: d for c, d in self.columns.items() if c in columns},
+                      [c for c in self.required if c in columns])
+
+    def __repr__(self):
+        return f'Schema({self.name!r}, {len(self.columns)} columns)'
+
+def _cast(series, dtype, schema_name):
+    column = series.name
+    if dtype == 'category':
+        return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    if dtype.startswith('datetime64'):
+        try:
+            return pd.to_datetime(series).astype(dtype)
+        except (ValueError, TypeError) as exc:
+            raise SchemaError(f'{schema_name}: column {column!r} is not a date: {exc}') from exc
+
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isna().sum() > series.isna().sum():
+        raise SchemaError(f'{schema_name}: column {column!r} has non-numeric values')
+    if np.dtype(dtype).kind in 'iu':
+        if values.isna().any():
+            raise SchemaError(f'{schema_name}: integer column {column!r} has missing values')
+        if (values % 1 != 0).any():
+            raise SchemaError(f'{schema_name}: integer column {column!r} has fractional values')
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            raise SchemaError(f'{schema_name}: column {column!r} does not fit in {dtype}')
+    return values.astype(dtype)
+
+def apply_schema(df, schema, copy=True):
+    """Cast the schema's columns of ``df`` to their compact dtypes and check required ones exist.
+
+    Columns not in the schema are left untouched. With ``copy=False`` the columns of ``df``
+    itself are replaced, which saves a copy when the caller owns the frame.
+    """
+    missing = [column for column in schema.required if column not in df.columns]
+    if missing:
+        raise SchemaError(f'{schema.name}: missing columns {missing}')
+    if copy:
+        df = df.copy()
+    for column, dtype in schema.columns.items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = _cast(df[column], dtype, schema.name)
+    return df
+
+def check_schema(df, schema):
+    """Raise SchemaError unless ``df`` already matches ``schema`` exactly."""
+    problems = [f'missing {column!r}' for column in schema.required if column not in df.columns]
+    for column, dtype in schema.columns.items():
+        if column in df.columns and df[column].dtype != dtype:
+            problems.append(f'{column!r} is {df[column].dtype}, expected {dtype}')
+    if problems:
+        raise SchemaError(f'{schema.name}: ' + '; '.join(problems))
+    return df
+
+def attach_settings(df, **settings):
+    """Keep per-frame settings once in ``df.attrs`` instead of as constant columns."""
+    df.attrs[SETTINGS_ATTR] = {**df.attrs.get(SETTINGS_ATTR, {}), **settings}
+    return df
+
+def with_settings(df):
+    """``df`` with its attached settings joined back in as columns, for printing and output files."""
+    settings = df.attrs.get(SETTINGS_ATTR, {})
+    return df.assign(**settings) if settings else df
+
+def integers_for_display(df, columns):
+    """``df`` with those of ``columns`` that hold only whole numbers shown as integers.
+
+    Quantities are float32 in the schemas; scripts whose sample data is in whole units use
+    this to keep printing and writing them as integers.
+    """
+    whole = [c for c in columns if c in df.columns and df[c].notna().all() and (df[c] % 1 == 0).all()]
+    return df.astype({c: 'int64' for c in whole})
+
+# Demand planning
+SALES_HISTORY = Schema('sales_history', {
+    'product_id': ID,
+    'week': WEEK,
+    'promotion': FLAG,
+    'sales': COUNT,
+})
+
+FORECAST = SALES_HISTORY.extend('forecast', {
+    '6_week_moving_avg_fcst': QUANTITY,
+    'exponential_smoothing_model': QUANTITY,
+    '3-wk no promo moving avg': QUANTITY,
+    'linear_regression_fcst': QUANTITY,
+}, required=['6_week_moving_avg_fcst', 'exponential_smoothing_model',
+             '3-wk no promo moving avg', 'linear_regression_fcst'])
+
+# Replenishment - safety / target stock (Code_and_logic.py, sample_daily_snapshot_logic.py)
+STOCK_INPUT = Schema('stock_input', {
+    'Product': ID,
+    'Daily Demand': QUANTITY,
+    'Std Demand Forecast': QUANTITY,
+    'Lead Time': DAYS,
+    'Review Time': DAYS,
+    'Z-score': QUANTITY,
+})
+
+STOCK_OUTPUT = STOCK_INPUT.extend('stock_output', {
+    'Forecast Method': ID,
+    'Forecast MAPE': QUANTITY,
+    'Cycle Stock': QUANTITY,
+    'Safety Stock': COUNT,
+    'Target Stock': QUANTITY,
+    'Daily Sales': QUANTITY,
+    'Final Planning Horizon (Days)': DAYS,
+    'Initial Target Inventory Units': QUANTITY,
+    'Initial Safety Stock': COUNT,
+    'Initial Cycle Stock': QUANTITY,
+    'Initial Target Weeks': QUANTITY,
+    'Final Target Inventory Units': QUANTITY,
+    'Final Target Weeks': QUANTITY,
+    'Final Safety Stock': COUNT,
+    'Final Cycle Stock': QUANTITY,
+    # Shelf life settings live in df.attrs; these columns only exist in joined-back output
+    'Shelf Life Days': DAYS,
+    'Shelf Life Cap': QUANTITY,
+    'Max Shelf Life Days': QUANTITY,
+    'Max Shelf Life Weeks': QUANTITY,
+}, required=['Cycle Stock', 'Safety Stock', 'Target Stock'])
+
+# Replenishment - inventory snapshot and order suggestions (user_interface.py)
+INVENTORY_SNAPSHOT = Schema('inventory_snapshot', {
+    'product_id': ID,
+    'inventory_id': ID,
+    'abc_sku': ID,
+    'target_inventory': COUNT,
+    'sellable_inventory': COUNT,
+    'available_inventory': COUNT,
+    'daily_demand': QUANTITY,
+    'lead_time': DAYS,
+    'shelf_life_days': DAYS,
+    'last_order_date': DATE,
+}, required=['product_id', 'sellable_inventory', 'available_inventory'])
+
+ORDERS = INVENTORY_SNAPSHOT.extend('orders', {
+    'inventory_gap': COUNT,
+    'available_gap': COUNT,
+    'days_of_inventory': QUANTITY,
+    'available_days': QUANTITY,
+    'reorder_point': QUANTITY,
+    'safety_stock': QUANTITY,
+    'cycle_stock': QUANTITY,
+    'replenishment_status': ID,
+    'suggested_order': QUANTITY,
+}, required=['target_inventory', 'daily_demand', 'lead_time', 'replenishment_status', 'suggested_order'])
@@ -0,0 +1,10 @@
+import importlib.util
+from importlib.machinery import SourceFileLoader
+
+def load_script(path, module_name):
+    """Import one of the repo scripts by file path (the forecast script has no .py suffix)."""
+    loader = SourceFileLoader(module_name, str(path))
+    spec = importlib.util.spec_from_loader(module_name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,152 @@
+"""Partitioned Parquet storage for demand history, forecasts and inventory snapshots.
+
+Datasets are written hive-style as ``<root>/week_block=<date>/sku_shard=<n>/part-0.parquet``,
+where a week block groups ``weeks_per_block`` consecutive weeks (a quarter by default)
+and the SKU shard is a stable hash of the product id. Inside each file rows are sorted
+by week, so week filters are answered from the partition directories first and from
+Parquet row group statistics after that. Reads project only the requested columns, so
+the forecast and replenishment code never parses the full history to get a slice of it.
+
+    write_dataset(history, 'store/demand_history')
+    recent = read_dataset('store/demand_history', columns=['product_id', 'week', 'sales'],
+                          start_week='2024-10-01', products=['Product_3'])
+
+One directory per single week would be the literal layout, but with a few hundred rows
+per file the per-file open cost dominates every read, hence the blocks.
+"""
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from common.schema import apply_schema
+
+DEFAULT_SHARDS = 8
+DEFAULT_WEEKS_PER_BLOCK = 13
+SHARD_COLUMN = 'sku_shard'
+BLOCK_COLUMN = 'week_block'
+BLOCK_EPOCH = pd.Timestamp('2000-01-03')  # a Monday, so W-MON weeks start blocks
+ROW_GROUP_ROWS = 64 * 1024
+
+def sku_shard(product_ids, n_shards=DEFAULT_SHARDS):
+    """Stable shard number per product id (crc32, so it does not change between runs)."""
+    values = pd.Series(product_ids)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash each category once and broadcast through the codes
+        shards = np.array([zlib.crc32(str(c).encode()) % n_shards for c in values.cat.categories], dtype=np.int16)
+        return shards[values.cat.codes.to_numpy()]
+    return np.array([zlib.crc32(str(v).encode()) % n_shards for v in values], dtype=np.int16)
+
+def week_block(weeks, weeks_per_block=DEFAULT_WEEKS_PER_BLOCK):
+    """First day of the block of ``weeks_per_block`` weeks each week falls in."""
+    weeks = pd.to_datetime(pd.Series(weeks)).dt.normalize()
+    offset_weeks = (weeks - BLOCK_EPOCH).dt.days // 7
+    return BLOCK_EPOCH + pd.to_timedelta((offset_weeks // weeks_per_block) * weeks_per_block * 7, unit='D')
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(BLOCK_COLUMN, pa.date32()), (SHARD_COLUMN, pa.int16())]), flavor='hive')
+
+def _open(root):
+    return ds.dataset(root, format='parquet', partitioning=_partitioning())
+
+def _decategorize(series):
+    """Values of a categorical in the dtype of its categories (float when ints have gaps)."""
+    dtype = series.cat.categories.dtype
+    if dtype.kind in 'iub' and series.isna().any():
+        dtype = 'float64'
+    return series.astype(dtype)
+
+def write_dataset(df, root, week_column='week', product_column='product_id', n_shards=DEFAULT_SHARDS,
+                  weeks_per_block=DEFAULT_WEEKS_PER_BLOCK, week=None):
+    """Write ``df`` as a Parquet dataset partitioned by week block and SKU shard.
+
+    ``week`` stamps frames without a week column (e.g. an inventory snapshot) with the
+    week they belong to. Weeks present in ``df`` replace the stored ones; other weeks
+    in the same blocks are carried over, so appending a week keeps the rest of its block.
+    Columns need not match earlier writes: carried-over rows get nulls for new columns.
+    """
+    table_df = df.copy(deep=False)
+    if week is not None:
+        table_df[week_column] = pd.Timestamp(week)
+    table_df[week_column] = pd.to_datetime(table_df[week_column])
+    # Categoricals carry every category into each file; let Parquet dictionary-encode per file
+    for column in table_df.columns:
+        if isinstance(table_df[column].dtype, pd.CategoricalDtype):
+            table_df[column] = _decategorize(table_df[column])
+    table_df[BLOCK_COLUMN] = week_block(table_df[week_column], weeks_per_block).dt.date.to_numpy()
+    table_df[SHARD_COLUMN] = sku_shard(table_df[product_column], n_shards)
+
+    if Path(root).exists():
+        blocks = sorted(set(table_df[BLOCK_COLUMN]))
+        existing = _open(root).to_table(filter=ds.field(BLOCK_COLUMN).isin(blocks)).to_pandas()
+        if len(existing):
+            existing[week_column] = pd.to_datetime(existing[week_column])
+            existing = existing[~existing[week_column].isin(table_df[week_column].unique())]
+        if len(existing):
+            # Columns may differ between writes; rows missing a column get nulls for it
+            columns = list(table_df.columns) + [c for c in existing.columns if c not in table_df.columns]
+            table_df = pd.concat([existing, table_df], ignore_index=True)[columns]
+
+    table_df = table_df.sort_values([week_column, product_column], kind='stable')
+    table_df[week_column] = table_df[week_column].dt.date
+    table = pa.Table.from_pandas(table_df, preserve_index=False)
+    ds.write_dataset(
+        table, root, format='parquet',
+        partitioning=_partitioning(),
+        existing_data_behavior='delete_matching',
+        basename_template='part-{i}.parquet',
+        min_rows_per_group=ROW_GROUP_ROWS,
+        max_rows_per_group=ROW_GROUP_ROWS)
+    return Path(root)
+
+def _filter_expression(week_column, product_column, start_week, end_week, products, n_shards,
+                       weeks_per_block):
+    expression = None
+
+    def both(left, right):
+        return right if left is None else left & right
+
+    # Each bound is given twice: on the block to skip directories, on the week for the rows
+    if start_week is not None:
+        start = pd.Timestamp(start_week)
+        expression = both(expression, ds.field(BLOCK_COLUMN) >= week_block([start], weeks_per_block)[0].date())
+        expression = both(expression, ds.field(week_column) >= start.date())
+    if end_week is not None:
+        end = pd.Timestamp(end_week)
+        expression = both(expression, ds.field(BLOCK_COLUMN) <= week_block([end], weeks_per_block)[0].date())
+        expression = both(expression, ds.field(week_column) <= end.date())
+    if products is not None:
+        products = [str(p) for p in products]
+        shards = sorted(set(int(s) for s in sku_shard(products, n_shards)))
+        expression = both(expression, ds.field(SHARD_COLUMN).isin(shards))
+        expression = both(expression, ds.field(product_column).isin(products))
+    return expression
+
+def read_dataset(root, columns=None, start_week=None, end_week=None, products=None, schema=None,
+                 week_column='week', product_column='product_id', n_shards=DEFAULT_SHARDS,
+                 weeks_per_block=DEFAULT_WEEKS_PER_BLOCK):
+    """Read a dataset written by ``write_dataset``, loading only ``columns`` and matching rows.
+
+    Numeric columns without nulls are handed to pandas without copying; pass ``schema`` to
+    cast the result back to the shared compact dtypes (weeks come back as datetime64).
+    ``n_shards`` and ``weeks_per_block`` must match the values the dataset was written with.
+    """
+    dataset = _open(root)
+    expression = _filter_expression(week_column, product_column, start_week, end_week, products,
+                                    n_shards, weeks_per_block)
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name not in (BLOCK_COLUMN, SHARD_COLUMN)]
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    if week_column in df.columns:
+        df[week_column] = pd.to_datetime(df[week_column])
+    if schema is not None:
+        df = apply_schema(df, schema.select(columns), copy=False)
+    return df
+
+def is_dataset(path):
+    """True if ``path`` is a dataset directory rather than a single CSV file."""
+    return path is not None and Path(path).is_dir()
@@ -0,0 +1,96 @@
+"""Tests of the partitioned Parquet store.
+
+    python -m pytest common
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import SALES_HISTORY, apply_schema
+from common.storage import read_dataset, write_dataset
+
+WEEKS = pd.date_range('2024-01-01', periods=4, freq='W-MON')
+PRODUCTS = [f'Product_{i+1}' for i in range(20)]
+
+def history(weeks, sales_offset=0):
+    """Sales that identify their (product, week), so misplaced rows show up."""
+    product_index = np.repeat(np.arange(len(PRODUCTS)), len(weeks))
+    week_index = np.tile(WEEKS.get_indexer(weeks), len(PRODUCTS))
+    return apply_schema(pd.DataFrame({
+        'product_id': np.repeat(PRODUCTS, len(weeks)),
+        'week': np.tile(weeks, len(PRODUCTS)),
+        'promotion': 0,
+        'sales': product_index * 10 + week_index + sales_offset,
+    }), SALES_HISTORY, copy=False)
+
+def stored(root, **kwargs):
+    df = read_dataset(root, schema=SALES_HISTORY, **kwargs)
+    return df.sort_values(['product_id', 'week']).reset_index(drop=True)
+
+def expected(*frames):
+    df = pd.concat(frames, ignore_index=True)
+    df['product_id'] = df['product_id'].astype(str)
+    df = apply_schema(df, SALES_HISTORY, copy=False)
+    return df.sort_values(['product_id', 'week']).reset_index(drop=True)
+
+def assert_same(actual, wanted, columns=('product_id', 'week', 'promotion', 'sales')):
+    columns = list(columns)
+    pd.testing.assert_frame_equal(
+        actual[columns].astype({'product_id': str}), wanted[columns].astype({'product_id': str}),
+        check_dtype=False)
+
+def test_append_rewrite_and_filtered_read(tmp_path):
+    root = tmp_path / 'history'
+    write_dataset(history(WEEKS[:2]), root)
+    write_dataset(history(WEEKS[2:3]), root)
+    assert_same(stored(root), expected(history(WEEKS[:2]), history(WEEKS[2:3])))
+
+    # Rewriting the middle week replaces it and keeps the weeks around it
+    middle = history(WEEKS[1:2], sales_offset=1000)
+    write_dataset(middle, root)
+    assert_same(stored(root), expected(history(WEEKS[:1]), middle, history(WEEKS[2:3])))
+
+    # A later write may add columns; carried-over rows read back with nulls for them
+    extended = history(WEEKS[3:4])
+    extended['forecast'] = np.float32(1.5)
+    write_dataset(extended, root)
+    everything = read_dataset(root)
+    assert len(everything) == 4 * len(PRODUCTS)
+    assert everything.loc[everything['week'] == WEEKS[3], 'forecast'].eq(1.5).all()
+    assert everything.loc[everything['week'] < WEEKS[3], 'forecast'].isna().all()
+
+    # Filtered read: a week range and a few products, projected columns only
+    sliced = stored(root, columns=['product_id', 'week', 'sales'], start_week=WEEKS[1], end_week=WEEKS[2],
+                    products=['Product_3', 'Product_17'])
+    wanted = expected(middle, history(WEEKS[2:3]))
+    wanted = wanted[wanted['product_id'].isin(['Product_3', 'Product_17'])].reset_index(drop=True)
+    assert list(sliced.columns) == ['product_id', 'week', 'sales']
+    assert_same(sliced, wanted, columns=['product_id', 'week', 'sales'])
+
+def test_rewrite_with_new_columns_replacing_every_stored_week(tmp_path):
+    root = tmp_path / 'safety_stock'
+    snapshot = pd.DataFrame({'product_id': PRODUCTS, 'Target Stock': np.arange(20, dtype=np.float32)})
+    write_dataset(snapshot, root, week=WEEKS[0])
+
+    snapshot['Shelf Life Days'] = np.int16(22)
+    write_dataset(snapshot, root, week=WEEKS[0])
+    df = read_dataset(root)
+    assert len(df) == len(PRODUCTS)
+    assert df['Shelf Life Days'].eq(22).all()
+
+def test_categoricals_keep_their_value_dtype(tmp_path):
+    root = tmp_path / 'categoricals'
+    df = pd.DataFrame({
+        'product_id': pd.Categorical(PRODUCTS[:3]),
+        'week': WEEKS[0],
+        'days': pd.Categorical([22, 22, None]),
+        'method': pd.Categorical(['ols', 'mint', 'ols']),
+    })
+    write_dataset(df, root)
+    result = read_dataset(root).sort_values('product_id').reset_index(drop=True)
+    assert result['days'].dtype.kind == 'f'
+    assert result['days'].iloc[:2].tolist() == [22.0, 22.0] and np.isnan(result['days'].iloc[2])
+    assert result['method'].astype(str).tolist() == ['ols', 'mint', 'ols']
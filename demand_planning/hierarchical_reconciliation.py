@@ -0,0 +1,308 @@
+"""Hierarchical aggregation and reconciliation of product forecasts across the network.
+
+Bottom series are product x FC. They add up along the tiers of the network design
+(FC -> regional DC -> main DC -> total) and across products (each node also has an
+"All" products series), giving a sparse summing matrix S with eight non-zeros per
+bottom column. Reconciled forecasts are coherent: every level is the sum of the
+bottom series below it.
+
+Methods:
+- ``bottom_up``  - aggregate the bottom forecasts
+- ``top_down``   - split the network total by proportions (default: bottom forecast shares,
+                   equal shares when the bottom forecasts sum to zero)
+- ``ols``        - y~ = S (S'S)^-1 S' y^
+- ``wls_struct`` - as ols with W = diag(S 1), the number of bottom series in each series
+- ``mint``       - as ols with W = diag of the in-sample residual variances (MinT with a
+                   diagonal covariance; the full sample covariance is dense n x n and does
+                   not scale to millions of series)
+
+The generalised least squares systems are solved matrix-free with conjugate gradients,
+so neither S'S nor any n x n matrix is ever formed.
+"""
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import LinearOperator, cg
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation
+from common.script_loader import load_script
+
+NETWORK_SCRIPT = Path(__file__).resolve().parents[1] / 'network_design' / 'supply_chain_current_design_ecommerce_asia.py'
+FORECAST_SCRIPT = Path(__file__).resolve().parent / 'demand_fcst_models_random_data'
+
+LEVELS = ['fc', 'regional_dc', 'main_dc', 'total']
+TOTAL_NODE = 'Total'
+ALL_PRODUCTS = 'All'
+CAPACITY_WEIGHTS = {'High': 2.0, 'Medium': 1.0, 'Low': 0.5}
+LEVEL_ALPHA = {'fc': 0.3, 'regional_dc': 0.25, 'main_dc': 0.2, 'total': 0.15}
+
+def _distance_km(a, b):
+    """Great-circle distance between two facilities."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (a['lat'], a['lng'], b['lat'], b['lng']))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+def build_network_tiers(facilities, routes):
+    """Regional DC and main DC parent of every FC, following the network routes.
+
+    An FC's parent is the regional DC with a ``regional_to_fc`` route to it and a regional
+    DC's parent the main DC with a ``main_to_regional`` route to it. Nodes without such a
+    route (Regional DC 6 is only fed from ports) go to the nearest node of the tier above.
+    """
+    def parent_of(node, route_type, parent_type):
+        for route in routes:
+            if route['type'] == route_type and route['to'] == node:
+                return route['from']
+        candidates = [name for name, data in facilities.items() if data['type'] == parent_type]
+        return min(candidates, key=lambda name: _distance_km(facilities[node], facilities[name]))
+
+    rows = []
+    for name, data in facilities.items():
+        if data['type'] != 'fulfillment':
+            continue
+        regional_dc = parent_of(name, 'regional_to_fc', 'regional_dc')
+        rows.append({
+            'fc': name,
+            'regional_dc': regional_dc,
+            'main_dc': parent_of(regional_dc, 'main_to_regional', 'main_dc'),
+        })
+    return pd.DataFrame(rows)
+
+def load_network_tiers():
+    """Tiers of the current network design in ``network_design``."""
+    network = load_script(NETWORK_SCRIPT, 'supply_chain_current_design_ecommerce_asia')
+    return build_network_tiers(network.create_facilities(), network.create_routes())
+
+def default_fc_shares(products, facilities=None):
+    """Every product stocked at every FC, demand split by FC capacity."""
+    if facilities is None:
+        facilities = load_script(NETWORK_SCRIPT, 'supply_chain_current_design_ecommerce_asia').create_facilities()
+    fcs = {name: CAPACITY_WEIGHTS[data['capacity']] for name, data in facilities.items()
+           if data['type'] == 'fulfillment'}
+    weights = np.array(list(fcs.values()))
+    products = list(products)
+    return pd.DataFrame({
+        'product_id': np.repeat(products, len(fcs)),
+        'fc': np.tile(list(fcs), len(products)),
+        'share': np.tile(weights / weights.sum(), len(products)),
+    })
+
+class Hierarchy:
+    """Sparse summing matrix over product x network node series.
+
+    ``series`` describes the rows of S (product_id, level, node), ``bottom`` its columns
+    (product_id, fc). ``bottom_rows`` are the rows of S that are the bottom series themselves.
+    """
+
+    def __init__(self, S, series, bottom, bottom_rows):
+        self.S = S
+        self.series = series
+        self.bottom = bottom
+        self.bottom_rows = bottom_rows
+
+    @classmethod
+    @instrumentation.timed(name='build_hierarchy', subsystem='demand_planning')
+    def from_mapping(cls, bottom, tiers):
+        """Build S from bottom (product_id, fc) pairs and the FC -> regional -> main DC tiers."""
+        bottom = bottom[['product_id', 'fc']].reset_index(drop=True)
+        tiers = tiers.set_index('fc')
+        if bottom.duplicated().any():
+            raise ValueError('bottom (product_id, fc) pairs must be unique')
+        unknown = set(bottom['fc']) - set(tiers.index)
+        if unknown:
+            raise ValueError(f'FCs missing from the network tiers: {sorted(unknown)}')
+
+        # One node id space for every level: FCs, regional DCs, main DCs, then the total
+        node_names = (list(tiers.index) + sorted(tiers['regional_dc'].unique())
+                      + sorted(tiers['main_dc'].unique()) + [TOTAL_NODE])
+        node_levels = (['fc'] * len(tiers) + ['regional_dc'] * tiers['regional_dc'].nunique()
+                       + ['main_dc'] * tiers['main_dc'].nunique() + ['total'])
+        node_index = pd.Index(node_names)
+        n_nodes = len(node_names)
+
+        fc_nodes = node_index.get_indexer(bottom['fc'])
+        regional_nodes = node_index.get_indexer(tiers.loc[bottom['fc'], 'regional_dc'])
+        main_nodes = node_index.get_indexer(tiers.loc[bottom['fc'], 'main_dc'])
+        total_nodes = np.full(len(bottom), n_nodes - 1)
+
+        products = pd.Categorical(bottom['product_id'])
+        product_codes = products.codes.astype(np.int64)
+        all_code = len(products.categories)
+
+        # Row key = product code * n_nodes + node id, for the product itself and for "All"
+        keys = []
+        for codes in (product_codes, np.full(len(bottom), all_code)):
+            for nodes in (fc_nodes, regional_nodes, main_nodes, total_nodes):
+                keys.append(codes * n_nodes + nodes)
+        keys = np.concatenate(keys)
+        columns = np.tile(np.arange(len(bottom)), 8)
+
+        unique_keys, rows = np.unique(keys, return_inverse=True)
+        S = sparse.csr_matrix((np.ones(len(keys), dtype=np.float64), (rows, columns)),
+                              shape=(len(unique_keys), len(bottom)))
+
+        product_names = np.append(products.categories.astype(object), ALL_PRODUCTS)
+        series = pd.DataFrame({
+            'product_id': product_names[unique_keys // n_nodes],
+            'level': np.array(node_levels)[unique_keys % n_nodes],
+            'node': np.array(node_names, dtype=object)[unique_keys % n_nodes],
+        })
+        bottom_rows = rows[:len(bottom)]
+        instrumentation.count('bottom_series', len(bottom))
+        instrumentation.count('series', len(series))
+        return cls(S, series, bottom, bottom_rows)
+
+    @property
+    def total_row(self):
+        match = (self.series['product_id'] == ALL_PRODUCTS) & (self.series['level'] == 'total')
+        return int(np.flatnonzero(match.to_numpy())[0])
+
+    def aggregate(self, bottom_values):
+        """All series from bottom values (m or m x T) as S @ y_bottom."""
+        return self.S @ np.asarray(bottom_values, dtype=np.float64)
+
+    def is_coherent(self, values, rtol=1e-6):
+        """True if every series equals the sum of its bottom series."""
+        values = np.asarray(values, dtype=np.float64)
+        expected = self.aggregate(values[self.bottom_rows])
+        return bool(np.allclose(values, expected, rtol=rtol, atol=rtol * np.abs(values).max()))
+
+    def _gls(self, base, weights, rtol, maxiter):
+        """Solve (S' W^-1 S) b = S' W^-1 y^ column by column with Jacobi-preconditioned CG."""
+        S = self.S
+        S_t = S.T.tocsr()
+        inverse_weights = 1.0 / weights
+        n_bottom = S.shape[1]
+
+        def matvec(v):
+            return S_t @ (inverse_weights * (S @ v))
+
+        operator = LinearOperator((n_bottom, n_bottom), matvec=matvec, dtype=np.float64)
+        diagonal = S_t @ inverse_weights  # S has 0/1 entries, so diag(S' W^-1 S) = S' w^-1
+        preconditioner = LinearOperator((n_bottom, n_bottom), matvec=lambda v: v / diagonal, dtype=np.float64)
+
+        bottom = np.empty((n_bottom, base.shape[1]))
+        for t in range(base.shape[1]):
+            rhs = S_t @ (inverse_weights * base[:, t])
+            start = base[self.bottom_rows, t]
+            solution, info = cg(operator, rhs, x0=start, rtol=rtol, maxiter=maxiter, M=preconditioner)
+            if info > 0:
+                raise RuntimeError(f'conjugate gradient did not converge for column {t} in {info} iterations')
+            bottom[:, t] = solution
+        return bottom
+
+    @instrumentation.timed(name='reconcile', subsystem='demand_planning')
+    def reconcile(self, base, method='ols', residuals=None, proportions=None, rtol=1e-8, maxiter=1000):
+        """Coherent forecasts from base forecasts of every series (n or n x T).
+
+        ``residuals`` (n x T_history in-sample errors) are required for ``mint``;
+        ``proportions`` (m, summing to 1) are optional for ``top_down``; by default they are
+        the shares of the bottom base forecasts, or equal shares where those sum to zero.
+        """
+        base = np.asarray(base, dtype=np.float64)
+        vector = base.ndim == 1
+        if vector:
+            base = base[:, None]
+        if base.shape[0] != self.S.shape[0]:
+            raise ValueError(f'expected {self.S.shape[0]} series, got {base.shape[0]}')
+
+        if method == 'bottom_up':
+            bottom = base[self.bottom_rows]
+        elif method == 'top_down':
+            if proportions is None:
+                bottom_base = base[self.bottom_rows]
+                totals = bottom_base.sum(axis=0, keepdims=True)
+                equal_shares = np.full_like(bottom_base, 1.0 / bottom_base.shape[0])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    proportions = np.where(totals != 0, bottom_base / totals, equal_shares)
+            else:
+                proportions = np.asarray(proportions, dtype=np.float64).reshape(-1, 1)
+            bottom = proportions * base[self.total_row]
+        elif method in ('ols', 'wls_struct', 'mint'):
+            if method == 'ols':
+                weights = np.ones(self.S.shape[0])
+            elif method == 'wls_struct':
+                weights = np.asarray(self.S.sum(axis=1)).ravel()
+            else:
+                if residuals is None:
+                    raise ValueError('mint needs in-sample residuals of every series')
+                weights = np.nanvar(np.asarray(residuals, dtype=np.float64), axis=1)
+                # Series with no usable residuals fall back to the structural weight
+                fallback = np.asarray(self.S.sum(axis=1)).ravel()
+                weights = np.where(np.isfinite(weights) & (weights > 0), weights, fallback)
+            bottom = self._gls(base, weights, rtol, maxiter)
+        else:
+            raise ValueError(f'unknown reconciliation method {method!r}')
+
+        instrumentation.count('series', base.shape[0] * base.shape[1])
+        reconciled = self.aggregate(bottom)
+        return reconciled[:, 0] if vector else reconciled
+
+def allocate_to_nodes(hierarchy, product_values, shares):
+    """Split product-level values (DataFrame indexed by product_id, one column per period)
+    over the hierarchy's bottom product x FC series using ``shares`` (product_id, fc, share)."""
+    bottom = hierarchy.bottom.merge(shares, on=['product_id', 'fc'], how='left')
+    share = bottom['share'].fillna(0.0).to_numpy()[:, None]
+    values = product_values.reindex(bottom['product_id']).to_numpy(dtype=np.float64)
+    return share * values
+
+def exp_smoothing_matrix(history, alpha=0.3):
+    """One-step-ahead exponential smoothing of every row of a series x period matrix.
+
+    ``alpha`` is a scalar or one value per row. Returns (in-sample forecasts with NaN in the first period, next-period forecast).
+    """
+    level = history[:, 0].astype(np.float64)
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), level.shape)
+    fitted = np.full(history.shape, np.nan)
+    for t in range(1, history.shape[1]):
+        fitted[:, t] = level
+        level = alpha * history[:, t] + (1 - alpha) * level
+    return fitted, level
+
+def main():
+    """Main function to reconcile the demand planning forecasts across the network."""
+    forecast_module = load_script(FORECAST_SCRIPT, 'demand_fcst_models_random_data')
+    history = forecast_module.generate_sales_data()
+    product_history = history.pivot_table(index='product_id', columns='week', values='sales', observed=True)
+
+    network = load_script(NETWORK_SCRIPT, 'supply_chain_current_design_ecommerce_asia')
+    facilities = network.create_facilities()
+    tiers = build_network_tiers(facilities, network.create_routes())
+    shares = default_fc_shares(product_history.index, facilities)
+    hierarchy = Hierarchy.from_mapping(shares, tiers)
+
+    # FC-level history with some noise around the capacity split, then every series from it
+    rng = np.random.default_rng(42)
+    bottom_history = allocate_to_nodes(hierarchy, product_history, shares)
+    bottom_history = np.round(bottom_history * rng.uniform(0.8, 1.2, bottom_history.shape))
+    all_history = hierarchy.aggregate(bottom_history)
+
+    # Each tier is forecast on its own (smoother at the top), so the base forecasts do not add up
+    alpha = hierarchy.series['level'].map(LEVEL_ALPHA).to_numpy()
+    fitted, next_week = exp_smoothing_matrix(all_history, alpha)
+    residuals = all_history - fitted
+    results = hierarchy.series.copy()
+    results['base'] = next_week
+    for method in ['bottom_up', 'top_down', 'ols', 'wls_struct', 'mint']:
+        results[method] = hierarchy.reconcile(next_week, method, residuals=residuals)
+
+    print(f"Hierarchy: {hierarchy.S.shape[1]} bottom series, {hierarchy.S.shape[0]} series, "
+          f"{hierarchy.S.nnz} non-zeros in S")
+    print(f"\nNetwork tiers:")
+    print(tiers)
+    pd.set_option('display.width', 200)
+    print(f"\nNext week forecast, all products, by node:")
+    print(results[results['product_id'] == ALL_PRODUCTS].round(1).to_string(index=False))
+    print(f"\nBase forecasts coherent: {hierarchy.is_coherent(next_week)}")
+    for method in ['bottom_up', 'top_down', 'ols', 'wls_struct', 'mint']:
+        print(f"{method} coherent: {hierarchy.is_coherent(results[method])}")
+
+    return results
+
+if __name__ == "__main__":
+    main()
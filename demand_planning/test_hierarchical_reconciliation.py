@@ -0,0 +1,115 @@
+"""Tests of the hierarchical reconciliation against the dense textbook formulas.
+
+    python -m pytest demand_planning
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from hierarchical_reconciliation import Hierarchy, load_network_tiers
+
+TIERS = load_network_tiers()
+
+def small_hierarchy():
+    """Three products stocked at different FC sets, so the tiers are unbalanced."""
+    fcs = TIERS['fc'].tolist()
+    bottom = pd.DataFrame(
+        [('P1', fc) for fc in fcs] + [('P2', fc) for fc in fcs[::2]] + [('P3', fcs[-1])],
+        columns=['product_id', 'fc'])
+    return Hierarchy.from_mapping(bottom, TIERS)
+
+def incoherent_forecasts(hierarchy, periods=3, seed=0):
+    """Bottom-up sums with noise on every series, so no level adds up."""
+    rng = np.random.default_rng(seed)
+    bottom = rng.uniform(50, 150, (hierarchy.S.shape[1], periods))
+    return hierarchy.aggregate(bottom) * rng.uniform(0.8, 1.2, (hierarchy.S.shape[0], periods))
+
+def dense_gls(hierarchy, base, weights):
+    """y~ = S (S' W^-1 S)^-1 S' W^-1 y^ with dense matrices."""
+    S = hierarchy.S.toarray()
+    W_inv = np.diag(1.0 / weights)
+    return S @ np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv @ base)
+
+def test_gls_methods_match_dense_formula():
+    hierarchy = small_hierarchy()
+    base = incoherent_forecasts(hierarchy)
+    residuals = np.random.default_rng(1).normal(0, 1, (hierarchy.S.shape[0], 20))
+    residuals *= np.linspace(1, 5, hierarchy.S.shape[0])[:, None]
+    weights = {
+        'ols': np.ones(hierarchy.S.shape[0]),
+        'wls_struct': hierarchy.S.toarray().sum(axis=1),
+        'mint': np.var(residuals, axis=1),
+    }
+    for method, method_weights in weights.items():
+        reconciled = hierarchy.reconcile(base, method, residuals=residuals, rtol=1e-12)
+        np.testing.assert_allclose(reconciled, dense_gls(hierarchy, base, method_weights), rtol=1e-7,
+                                   err_msg=method)
+
+# Rows of all-NaN residuals make nanvar warn before they fall back
+@pytest.mark.filterwarnings('ignore:Degrees of freedom')
+def test_mint_falls_back_to_structural_weights_without_residuals():
+    hierarchy = small_hierarchy()
+    base = incoherent_forecasts(hierarchy)
+    residuals = np.random.default_rng(1).normal(0, 1, (hierarchy.S.shape[0], 20))
+    residuals[:5] = np.nan
+    residuals[5:8] = 0.0
+    weights = np.var(residuals, axis=1)
+    weights[:8] = hierarchy.S.toarray().sum(axis=1)[:8]
+    reconciled = hierarchy.reconcile(base, 'mint', residuals=residuals, rtol=1e-12)
+    np.testing.assert_allclose(reconciled, dense_gls(hierarchy, base, weights), rtol=1e-7)
+
+def test_every_method_is_coherent():
+    hierarchy = small_hierarchy()
+    base = incoherent_forecasts(hierarchy)
+    residuals = np.random.default_rng(1).normal(0, 1, (hierarchy.S.shape[0], 20))
+    assert not hierarchy.is_coherent(base[:, 0])
+    for method in ['bottom_up', 'top_down', 'ols', 'wls_struct', 'mint']:
+        reconciled = hierarchy.reconcile(base, method, residuals=residuals)
+        assert reconciled.shape == base.shape
+        for t in range(base.shape[1]):
+            assert hierarchy.is_coherent(reconciled[:, t]), method
+
+def test_bottom_up_and_top_down():
+    hierarchy = small_hierarchy()
+    base = incoherent_forecasts(hierarchy)[:, 0]
+    bottom_up = hierarchy.reconcile(base, 'bottom_up')
+    np.testing.assert_allclose(bottom_up[hierarchy.bottom_rows], base[hierarchy.bottom_rows])
+
+    # Default proportions are the bottom forecast shares of the network total
+    top_down = hierarchy.reconcile(base, 'top_down')
+    bottom = base[hierarchy.bottom_rows]
+    np.testing.assert_allclose(top_down[hierarchy.bottom_rows], bottom / bottom.sum() * base[hierarchy.total_row])
+    assert top_down[hierarchy.total_row] == pytest.approx(base[hierarchy.total_row])
+
+def test_top_down_with_zero_bottom_forecasts_uses_equal_shares():
+    hierarchy = small_hierarchy()
+    base = np.zeros(hierarchy.S.shape[0])
+    base[hierarchy.total_row] = 120.0
+    reconciled = hierarchy.reconcile(base, 'top_down')
+    assert np.isfinite(reconciled).all()
+    np.testing.assert_allclose(reconciled[hierarchy.bottom_rows], 120.0 / hierarchy.S.shape[1])
+    assert hierarchy.is_coherent(reconciled)
+
+def test_duplicate_bottom_pairs_are_rejected():
+    fc = TIERS['fc'].iloc[0]
+    bottom = pd.DataFrame({'product_id': ['P1', 'P1'], 'fc': [fc, fc]})
+    with pytest.raises(ValueError, match='must be unique'):
+        Hierarchy.from_mapping(bottom, TIERS)
+
+def test_unknown_fc_is_rejected():
+    bottom = pd.DataFrame({'product_id': ['P1', 'P1'], 'fc': [TIERS['fc'].iloc[0], 'Nowhere FC']})
+    with pytest.raises(ValueError, match='Nowhere FC'):
+        Hierarchy.from_mapping(bottom, TIERS)
+
+def test_wrong_number_of_series_and_unknown_method():
+    hierarchy = small_hierarchy()
+    with pytest.raises(ValueError, match='expected'):
+        hierarchy.reconcile(np.zeros(hierarchy.S.shape[0] - 1))
+    with pytest.raises(ValueError, match='unknown reconciliation method'):
+        hierarchy.reconcile(np.zeros(hierarchy.S.shape[0]), 'middle_out')
+    with pytest.raises(ValueError, match='residuals'):
+        hierarchy.reconcile(np.zeros(hierarchy.S.shape[0]), 'mint')
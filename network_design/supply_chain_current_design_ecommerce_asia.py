@@ -3,14 +3,18 @@ import pandas as pd
 import numpy as np
 from folium import plugins
 import json
+import sys
+from pathlib import Path
 
-def create_supply_chain_map():
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import instrumentation
+
+def create_facilities():
     """
-    Create an interactive supply chain current design map using folium
+    Facilities of the Asian e-commerce network keyed by name
     """
-    
     # Define supply chain facilities for Asian E-commerce Company
-    facilities = {
+    return {
         # Suppliers (Shenzhen area and local)
         'Supplier 1': {'lat': 22.3193, 'lng': 114.1694, 'type': 'supplier', 'capacity': 'High'},
         'Supplier 2': {'lat': 22.5, 'lng': 114.0, 'type': 'supplier', 'capacity': 'High'},
@@ -55,9 +59,13 @@ def create_supply_chain_map():
         'FC 8': {'lat': 35.5, 'lng': 139.8, 'type': 'fulfillment', 'capacity': 'Medium'},
         'FC 9': {'lat': 35.9, 'lng': 140.7, 'type': 'fulfillment', 'capacity': 'Medium'}
     }
-    
+
+def create_routes():
+    """
+    Routes between facilities of the Asian e-commerce network
+    """
     # Define supply chain routes for Asian E-commerce Company
-    routes = [
+    return [
         # Suppliers to Main DCs (High Volume)
         {'from': 'Supplier 1', 'to': 'Main DC 1', 'type': 'supplier_to_main', 'volume': 'High'},
         {'from': 'Supplier 2', 'to': 'Main DC 1', 'type': 'supplier_to_main', 'volume': 'High'},
@@ -120,6 +128,17 @@ def create_supply_chain_map():
         {'from': 'Main DC 1', 'to': 'FC 1', 'type': 'main_to_fc', 'volume': 'High'},
         {'from': 'Main DC 2', 'to': 'FC 2', 'type': 'main_to_fc', 'volume': 'High'}
     ]
+
+@instrumentation.timed(subsystem='network_design')
+def create_supply_chain_map(facilities=None, routes=None):
+    """
+    Create an interactive supply chain current design map using folium
+    """
+    
+    facilities = create_facilities() if facilities is None else facilities
+    routes = create_routes() if routes is None else routes
+    instrumentation.count('facilities', len(facilities))
+    instrumentation.count('routes', len(routes))
     
     # Create the base map centered on Asia-Pacific region
     m = folium.Map(
@@ -309,6 +328,7 @@ def create_supply_chain_map():
     
     return m
 
+@instrumentation.timed(subsystem='network_design')
 def add_supply_chain_metrics(map_obj):
     """
     Add supply chain performance metrics to the map
@@ -352,7 +372,8 @@ def main():
     
     # Save the map
     output_file = 'supply_chain_current_design_asian_ecommerce.html'
-    supply_chain_map.save(output_file)
+    with instrumentation.stage('save_map', subsystem='network_design'):
+        supply_chain_map.save(output_file)
     
     print(f"Asian e-commerce supply chain map created successfully!")
     print(f"Map saved as: {output_file}")
@@ -0,0 +1,276 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from common import instrumentation
+from common.artifact_cache import ArtifactCache
+from common.script_loader import load_script
+from common.schema import (FORECAST, INVENTORY_SNAPSHOT, ORDERS, SALES_HISTORY, STOCK_INPUT, STOCK_OUTPUT,
+                           apply_schema, check_schema, with_settings)
+from common.storage import is_dataset, read_dataset, write_dataset
+
+FORECAST_SCRIPT = REPO_ROOT / 'demand_planning' / 'demand_fcst_models_random_data'
+SAFETY_STOCK_SCRIPT = REPO_ROOT / 'replenishment_ordering_system' / 'short_shelf_skus' / 'Code_and_logic.py'
+ORDERS_SCRIPT = REPO_ROOT / 'replenishment_ordering_system' / 'User_Interface_Visual' / 'user_interface.py'
+INVENTORY_CLIENT = REPO_ROOT / 'replenishment_ordering_system' / 'inventory_ingestion' / 'inventory_client.py'
+PIPELINE_SCRIPT = Path(__file__).resolve()
+# Every stage casts its output with the shared schemas, so a dtype change invalidates the cache
+SCHEMA_MODULE = REPO_ROOT / 'common' / 'schema.py'
+
+DAYS_IN_WEEK = 7
+
+def load_sales_history(history_path=None, n_products=10, n_weeks=52, seed=42):
+    """Read weekly sales history from a Parquet dataset or CSV, or generate it with the forecast script."""
+    if is_dataset(history_path):
+        history = read_dataset(history_path, columns=['product_id', 'week', 'promotion', 'sales'],
+                               schema=SALES_HISTORY)
+        return history.sort_values(['product_id', 'week']).reset_index(drop=True)
+    if history_path:
+        history = pd.read_csv(history_path, usecols=['product_id', 'week', 'promotion', 'sales'])
+        return apply_schema(history, SALES_HISTORY)
+    forecast_module = load_script(FORECAST_SCRIPT, 'demand_fcst_models_random_data')
+    return forecast_module.generate_sales_data(n_products, n_weeks, seed)
+
+def run_forecast(history):
+    """Stage 1: run every forecasting method over the sales history."""
+    forecast_module = load_script(FORECAST_SCRIPT, 'demand_fcst_models_random_data')
+    return forecast_module.apply_forecasts(history.copy())
+
+def summarize_demand(forecast_df):
+    """Turn weekly forecasts into the daily demand inputs of the safety stock logic.
+
+    For each product the method with the lowest MAPE is chosen; its latest forecast gives
+    the daily demand and the spread of its errors gives the daily forecast deviation.
+    Products without any forecast yet (too little history) fall back to their mean sales
+    and the spread of their sales, and are reported.
+    """
+    forecast_module = load_script(FORECAST_SCRIPT, 'demand_fcst_models_random_data')
+    mape_df = forecast_module.calculate_mape(forecast_df).set_index('product_id')
+    methods_by_mape_column = {v: k for k, v in forecast_module.MAPE_COLUMNS.items()}
+
+    rows = []
+    fallback_products = []
+    for product, product_rows in forecast_df.groupby('product_id', sort=False, observed=True):
+        mape_row = mape_df.loc[product, list(forecast_module.MAPE_COLUMNS.values())].astype(float)
+        forecasts = None
+        if mape_row.notna().any():
+            best_mape_column = mape_row.idxmin()
+            best_method = methods_by_mape_column[best_mape_column]
+            forecasts = product_rows[best_method].astype(float)
+
+        if forecasts is not None and forecasts.notna().any():
+            errors = (product_rows['sales'] - forecasts).dropna()
+            weekly_demand = forecasts.dropna().iloc[-1]
+            weekly_std = errors.std(ddof=1) if len(errors) > 1 else 0.0
+            method, method_mape = best_method, mape_row[best_mape_column]
+        else:
+            sales = product_rows['sales'].astype(float)
+            weekly_demand = sales.mean()
+            weekly_std = sales.std(ddof=1) if len(sales) > 1 else 0.0
+            method, method_mape = 'mean_sales', np.nan
+            fallback_products.append(product)
+
+        rows.append({
+            'Product': product,
+            'Forecast Method': method,
+            'Forecast MAPE': method_mape,
+            'Daily Demand': round(weekly_demand / DAYS_IN_WEEK, 2),
+            'Std Demand Forecast': round(weekly_std / np.sqrt(DAYS_IN_WEEK), 2),
+        })
+
+    if fallback_products:
+        instrumentation.count('fallback_products', len(fallback_products))
+        print(f"No usable forecast for {len(fallback_products)} product(s), using mean sales: "
+              f"{', '.join(map(str, fallback_products[:10]))}{' ...' if len(fallback_products) > 10 else ''}")
+    return pd.DataFrame(rows)
+
+def run_safety_stock(forecast_df, lead_time=15, review_time=7, z_score=1.96, high_z_score=2.56,
+                     shelf_life_days=None, inventory_cap_percentage=0.7):
+    """Stage 2: safety, cycle and target stock per product from the forecast."""
+    safety_module = load_script(SAFETY_STOCK_SCRIPT, 'Code_and_logic')
+    df = summarize_demand(forecast_df)
+    df['Lead Time'] = lead_time
+    df['Review Time'] = review_time
+    df['Z-score'] = z_score
+    df = apply_schema(df, STOCK_INPUT)
+    df = safety_module.calculate_basic_inventory_metrics(df, high_z_score)
+    if shelf_life_days:
+        df = safety_module.calculate_target_inventory(df, shelf_life_days, inventory_cap_percentage)
+    return df
+
+def create_inventory_snapshot(products, daily_demand, seed=42):
+    """Synthesize on-hand inventory when no snapshot file is supplied."""
+    rng = np.random.default_rng(seed)
+    days_on_hand = rng.uniform(5, 30, len(products))
+    sellable = np.round(np.asarray(daily_demand) * days_on_hand).astype(int)
+    available = np.round(sellable * rng.uniform(0.85, 1.0, len(products))).astype(int)
+    return apply_schema(pd.DataFrame({
+        'product_id': list(products),
+        'inventory_id': [f'INV{i+1:03d}' for i in range(len(products))],
+        'sellable_inventory': sellable,
+        'available_inventory': available,
+    }), INVENTORY_SNAPSHOT, copy=False)
+
+def load_latest_snapshot(dataset_path):
+    """Read the most recent week of an inventory snapshot dataset."""
+    snapshots = read_dataset(dataset_path, schema=INVENTORY_SNAPSHOT)
+    latest = snapshots[snapshots['week'] == snapshots['week'].max()]
+    return latest.drop(columns='week').sort_values('product_id').reset_index(drop=True)
+
+def save_outputs(outputs, output_dir, output_format='csv'):
+    """Write each stage output as CSV or as a Parquet dataset partitioned by week and SKU shard."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Per-frame settings (shelf life) are written as columns so the files are self-describing
+    outputs = {stage_name: with_settings(df) for stage_name, df in outputs.items()}
+    if output_format == 'csv':
+        for stage_name, df in outputs.items():
+            df.to_csv(output_dir / f'{stage_name}.csv', index=False)
+        return output_dir
+
+    # Stock and order outputs are snapshots as of the last forecast week
+    as_of_week = outputs['forecast']['week'].max()
+    write_dataset(outputs['forecast'], output_dir / 'forecast')
+    write_dataset(outputs['safety_stock'], output_dir / 'safety_stock', product_column='Product', week=as_of_week)
+    write_dataset(outputs['orders'], output_dir / 'orders', week=as_of_week)
+    return output_dir
+
+def classify_abc(daily_demand, a_share=0.8, b_share=0.95):
+    """ABC class by cumulative share of demand (A up to 80%, B up to 95%, C the rest)."""
+    order = daily_demand.sort_values(ascending=False)
+    cumulative_share = order.cumsum() / order.sum()
+    classes = np.where(cumulative_share <= a_share, 'A', np.where(cumulative_share <= b_share, 'B', 'C'))
+    # The top seller is always an A item even if it alone exceeds the A share
+    classes[0] = 'A'
+    return pd.Series(classes, index=order.index).reindex(daily_demand.index)
+
+def run_orders(safety_df, inventory_df):
+    """Stage 3: order suggestions from target stock and the inventory snapshot."""
+    orders_module = load_script(ORDERS_SCRIPT, 'user_interface')
+    target_column = 'Final Target Inventory Units' if 'Final Target Inventory Units' in safety_df else 'Target Stock'
+
+    df = safety_df[['Product', 'Daily Demand', 'Lead Time', target_column]].rename(columns={
+        'Product': 'product_id',
+        'Daily Demand': 'daily_demand',
+        'Lead Time': 'lead_time',
+        target_column: 'target_inventory',
+    })
+    # Planning columns come from the safety stock stage, the snapshot only supplies stock on hand
+    inventory_df = inventory_df.drop(columns=[c for c in df.columns if c != 'product_id'], errors='ignore')
+    df = df.merge(inventory_df, on='product_id', how='inner')
+    if 'abc_sku' not in df:
+        df['abc_sku'] = classify_abc(df['daily_demand'])
+    return orders_module.calculate_inventory_metrics(df)
+
+def run_pipeline(cache_dir, history_path=None, inventory_path=None, n_products=10, n_weeks=52,
+                 seed=42, lead_time=15, review_time=7, z_score=1.96, high_z_score=2.56,
+                 shelf_life_days=None, inventory_cap_percentage=0.7, force=False, inventory_url=None):
+    """Run forecast -> safety stock -> orders, reusing every stage whose inputs are unchanged."""
+    cache = ArtifactCache(cache_dir)
+    history = load_sales_history(history_path, n_products, n_weeks, seed)
+
+    with instrumentation.stage('forecast', subsystem='pipeline') as s:
+        forecast_df, forecast_cached = cache.run_stage(
+            'forecast', lambda: run_forecast(history),
+            inputs={'history': history},
+            sources=[FORECAST_SCRIPT, PIPELINE_SCRIPT, SCHEMA_MODULE],
+            force=force)
+        check_schema(forecast_df, FORECAST)
+        s.count('cached', int(forecast_cached))
+        s.count('rows', len(forecast_df))
+
+    safety_params = {
+        'lead_time': lead_time,
+        'review_time': review_time,
+        'z_score': z_score,
+        'high_z_score': high_z_score,
+        'shelf_life_days': shelf_life_days,
+        'inventory_cap_percentage': inventory_cap_percentage,
+    }
+    with instrumentation.stage('safety_stock', subsystem='pipeline') as s:
+        safety_df, safety_cached = cache.run_stage(
+            'safety_stock', lambda: run_safety_stock(forecast_df, **safety_params),
+            params=safety_params,
+            inputs={'forecast': forecast_df},
+            sources=[SAFETY_STOCK_SCRIPT, FORECAST_SCRIPT, PIPELINE_SCRIPT, SCHEMA_MODULE],
+            force=force)
+        check_schema(safety_df, STOCK_OUTPUT)
+        s.count('cached', int(safety_cached))
+        s.count('rows', len(safety_df))
+
+    if inventory_url:
+        inventory_client = load_script(INVENTORY_CLIENT, 'inventory_client')
+        inventory_df = inventory_client.load_inventory_snapshot(inventory_url)
+    elif is_dataset(inventory_path):
+        inventory_df = load_latest_snapshot(inventory_path)
+    elif inventory_path:
+        inventory_df = apply_schema(pd.read_csv(inventory_path), INVENTORY_SNAPSHOT, copy=False)
+    else:
+        inventory_df = create_inventory_snapshot(safety_df['Product'], safety_df['Daily Demand'], seed)
+    # Whatever the source, the orders stage gets a typed snapshot
+    check_schema(inventory_df, INVENTORY_SNAPSHOT)
+
+    with instrumentation.stage('orders', subsystem='pipeline') as s:
+        orders_df, orders_cached = cache.run_stage(
+            'orders', lambda: run_orders(safety_df, inventory_df),
+            inputs={'safety_stock': safety_df, 'inventory': inventory_df},
+            sources=[ORDERS_SCRIPT, PIPELINE_SCRIPT, SCHEMA_MODULE],
+            force=force)
+        check_schema(orders_df, ORDERS)
+        s.count('cached', int(orders_cached))
+        s.count('rows', len(orders_df))
+
+    status = {'forecast': forecast_cached, 'safety_stock': safety_cached, 'orders': orders_cached}
+    return {'forecast': forecast_df, 'safety_stock': safety_df, 'orders': orders_df}, status
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the forecast -> safety stock -> orders pipeline.')
+    parser.add_argument('--history', help='CSV or Parquet dataset with product_id, week, promotion, sales (default: generated)')
+    parser.add_argument('--inventory', help='CSV or Parquet dataset inventory snapshot keyed by product_id (default: generated)')
+    parser.add_argument('--inventory-url', help='WMS / ERP base URL to page the inventory snapshot from')
+    parser.add_argument('--output-dir', default='pipeline_output', help='where the stage outputs are written')
+    parser.add_argument('--output-format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--cache-dir', default='.pipeline_cache', help='where cached stage artifacts live')
+    parser.add_argument('--n-products', type=int, default=10)
+    parser.add_argument('--n-weeks', type=int, default=52)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--lead-time', type=int, default=15)
+    parser.add_argument('--review-time', type=int, default=7)
+    parser.add_argument('--z-score', type=float, default=1.96)
+    parser.add_argument('--high-z-score', type=float, default=2.56)
+    parser.add_argument('--shelf-life-days', type=int, help='apply the short shelf life cap')
+    parser.add_argument('--inventory-cap-percentage', type=float, default=0.7)
+    parser.add_argument('--force', action='store_true', help='recompute every stage')
+    parser.add_argument('--metrics', help='write stage timings / peak memory to this .jsonl, .json or .csv file')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main function to run the end-to-end pipeline."""
+    args = parse_args(argv)
+    if args.metrics:
+        instrumentation.enable(args.metrics)
+
+    outputs, status = run_pipeline(
+        args.cache_dir, args.history, args.inventory, args.n_products, args.n_weeks, args.seed,
+        args.lead_time, args.review_time, args.z_score, args.high_z_score,
+        args.shelf_life_days, args.inventory_cap_percentage, args.force, args.inventory_url)
+
+    output_dir = save_outputs(outputs, args.output_dir, args.output_format)
+    for stage_name, df in outputs.items():
+        print(f"{stage_name}: {'cached' if status[stage_name] else 'computed'} ({len(df)} rows)")
+
+    print(f"\nOrder suggestions:")
+    print(outputs['orders'][['product_id', 'abc_sku', 'target_inventory', 'sellable_inventory',
+                             'replenishment_status', 'suggested_order']])
+    print(f"\nFiles saved to: {output_dir}")
+
+    return outputs
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
 from IPython.display import display, HTML
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common import instrumentation
+from common.schema import INVENTORY_SNAPSHOT, ORDERS, apply_schema
 
 def create_sample_data():
     """Create sample inventory data for the replenishment system."""
@@ -28,10 +34,12 @@ def create_sample_data():
             datetime.now() - timedelta(days=8)
         ]
     }
-    return pd.DataFrame(data)
+    return apply_schema(pd.DataFrame(data), INVENTORY_SNAPSHOT, copy=False)
 
+@instrumentation.timed(subsystem='replenishment')
 def calculate_inventory_metrics(df):
     """Calculate additional inventory metrics."""
+    instrumentation.count('rows', len(df))
     # Calculate inventory gaps
     df['inventory_gap'] = df['target_inventory'] - df['sellable_inventory']
     df['available_gap'] = df['target_inventory'] - df['available_inventory']
@@ -60,10 +68,12 @@ def calculate_inventory_metrics(df):
         if row['sellable_inventory'] <= row['reorder_point'] else 0, axis=1
     )
     
-    return df
+    return apply_schema(df, ORDERS)
 
+@instrumentation.timed(subsystem='replenishment')
 def display_dashboard(df):
     """Display the inventory dashboard in Jupyter."""
+    instrumentation.count('rows', len(df))
     
     # Header
     display(HTML("<h1>📦 Inventory Replenishment System</h1>"))
@@ -267,5 +277,7 @@ def main():
 if __name__ == "__main__":
     df = main()
 else:
-    # For Jupyter notebook execution
-    df = main() 
+    # For Jupyter notebook execution (plain Python imports, e.g. the pipeline, only need the functions)
+    from IPython import get_ipython
+    if get_ipython() is not None:
+        df = main() 
@@ -1,5 +1,11 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.schema import STOCK_INPUT, STOCK_OUTPUT, apply_schema, integers_for_display
+
 # Original Data
 data = {'Product' : ['Product A', 'Product B', 'Product C'],
         'Daily Demand' : [20, 30, 40],
@@ -10,7 +16,7 @@ data = {'Product' : ['Product A', 'Product B', 'Product C'],
        }
 
 # Create DataFrame
-df = pd.DataFrame(data)
+df = apply_schema(pd.DataFrame(data), STOCK_INPUT, copy=False)
 
 # Calculate Cycle Stock
 df['Cycle Stock'] = (df['Daily Demand'] * (df['Lead Time'] + df['Review Time'])).round(0)
@@ -29,7 +35,9 @@ df['Daily Sales'] = df['Daily Demand'] - 2  # Example: assume sales is daily dem
 df['Final Planning Horizon (Days)'] = df['Lead Time'] + df['Review Time']
 
 # Reorder columns to place Target Stock, Cycle Stock, and Safety Stock right after Product
+df = apply_schema(df, STOCK_OUTPUT)
 df_result = df[['Product', 'Target Stock', 'Cycle Stock', 'Safety Stock', 'Daily Demand', 'Daily Sales', 'Final Planning Horizon (Days)']]
 
-# Print the final DataFrame
+# Print the final DataFrame (whole-unit quantities as integers)
+df_result = integers_for_display(df_result, ['Target Stock', 'Cycle Stock', 'Daily Demand', 'Daily Sales'])
 print(df_result)
@@ -0,0 +1,147 @@
+"""Async client paging an inventory snapshot out of the WMS / ERP HTTP endpoint.
+
+The first page tells the client how many items and pages there are. The remaining pages
+are fetched by a fixed pool of workers over one pooled connection set: at most
+``max_connections`` requests are in flight, and each page is written straight into
+preallocated column arrays, so memory stays at one snapshot however far the server
+runs ahead. Failed requests (connection errors, timeouts, 429 and 5xx) are retried
+with exponential backoff.
+
+    snapshot = load_inventory_snapshot('http://wms.internal', page_size=5000)
+    orders = calculate_inventory_metrics(snapshot.merge(targets, on='product_id'))
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common import instrumentation
+from common.schema import INVENTORY_SNAPSHOT, apply_schema
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class IngestionError(RuntimeError):
+    """Raised when a page cannot be fetched after all retries or the pages do not add up."""
+
+def _retry_delay(retry_after, default):
+    """Seconds to wait from a ``Retry-After`` header (delay seconds or an HTTP date)."""
+    if not retry_after:
+        return default
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+async def fetch_page(session, url, page, page_size, retries=3, backoff=0.2):
+    """GET one page, retrying transient failures; returns the decoded JSON body."""
+    params = {'page': page, 'page_size': page_size}
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    await asyncio.sleep(_retry_delay(response.headers.get('Retry-After'), backoff * 2 ** attempt))
+                    continue
+                if response.status != 200:
+                    raise IngestionError(f'page {page}: HTTP {response.status}')
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            if attempt == retries:
+                raise IngestionError(f'page {page}: {exc!r} after {retries} retries') from exc
+            await asyncio.sleep(backoff * 2 ** attempt)
+    raise IngestionError(f'page {page}: still failing after {retries} retries')
+
+class _ColumnBuffer:
+    """Preallocated column arrays filled page by page, in whatever order pages arrive."""
+
+    def __init__(self, total_items, column_names):
+        self.total_items = total_items
+        self.filled = 0
+        self.columns = {}
+        for name in column_names:
+            # Numbers are collected as float64 so a null stays a NaN for apply_schema to report;
+            # ids and dates are cast at the end
+            dtype = INVENTORY_SNAPSHOT.columns.get(name)
+            if dtype is None or dtype == 'category' or dtype.startswith('datetime64'):
+                dtype = object
+            else:
+                dtype = np.float64
+            self.columns[name] = np.empty(total_items, dtype=dtype)
+
+    def write(self, offset, page_columns):
+        n_rows = len(next(iter(page_columns.values()))) if page_columns else 0
+        if offset + n_rows > self.total_items:
+            raise IngestionError(f'page at offset {offset} overruns the {self.total_items} item snapshot')
+        for name, values in page_columns.items():
+            if name in self.columns:
+                try:
+                    self.columns[name][offset:offset + n_rows] = values
+                except (TypeError, ValueError) as exc:
+                    raise IngestionError(f'column {name!r} at offset {offset}: {exc}') from exc
+        self.filled += n_rows
+
+    def to_frame(self):
+        if self.filled != self.total_items:
+            raise IngestionError(f'received {self.filled} of {self.total_items} items')
+        return apply_schema(pd.DataFrame(self.columns, copy=False), INVENTORY_SNAPSHOT, copy=False)
+
+async def fetch_inventory_snapshot(base_url, page_size=1000, max_connections=32, retries=3, backoff=0.2,
+                                   timeout=30, session=None):
+    """Fetch every page of the snapshot concurrently and return it as a typed frame."""
+    url = base_url.rstrip('/') + '/inventory'
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_connections),
+            timeout=aiohttp.ClientTimeout(total=timeout))
+    try:
+        with instrumentation.stage('fetch_inventory_snapshot', subsystem='replenishment') as s:
+            first = await fetch_page(session, url, 1, page_size, retries, backoff)
+            # The server may cap the page size; page offsets follow the size it actually used
+            page_size = first['page_size']
+            buffer = _ColumnBuffer(first['total_items'], first['columns'].keys())
+            buffer.write(0, first['columns'])
+
+            pages = asyncio.Queue()
+            for page in range(2, first['total_pages'] + 1):
+                pages.put_nowait(page)
+
+            async def worker():
+                while True:
+                    try:
+                        page = pages.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    body = await fetch_page(session, url, page, page_size, retries, backoff)
+                    buffer.write((page - 1) * page_size, body['columns'])
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(max_connections, pages.qsize()))]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                for task in workers:
+                    task.cancel()
+                raise
+
+            s.count('pages', first['total_pages'])
+            s.count('rows', first['total_items'])
+            return buffer.to_frame()
+    finally:
+        if own_session:
+            await session.close()
+
+def load_inventory_snapshot(base_url, **kwargs):
+    """Blocking wrapper around ``fetch_inventory_snapshot`` for scripts and the pipeline."""
+    return asyncio.run(fetch_inventory_snapshot(base_url, **kwargs))
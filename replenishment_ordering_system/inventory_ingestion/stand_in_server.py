@@ -0,0 +1,111 @@
+"""Local stand-in for the WMS / ERP inventory endpoint.
+
+Serves a synthetic inventory snapshot in pages of columns:
+
+    GET /inventory?page=1&page_size=1000
+    {"page": 1, "page_size": 1000, "total_items": 8000, "total_pages": 8,
+     "columns": {"product_id": [...], "inventory_id": [...], ...}}
+
+Latency and a rate of 503 failures can be injected to exercise the client's retries, and
+``max_page_size`` caps the page size like real endpoints do.
+
+    python replenishment_ordering_system/inventory_ingestion/stand_in_server.py --products 100000
+"""
+import argparse
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+def create_snapshot_columns(n_products, seed=42):
+    """Synthetic snapshot in columnar form, product ids matching the forecast script's."""
+    rng = np.random.default_rng(seed)
+    sellable = rng.integers(50, 800, n_products)
+    available = (sellable * rng.uniform(0.85, 1.0, n_products)).astype(int)
+    last_order = pd.Timestamp('2024-12-23') - pd.to_timedelta(rng.integers(1, 11, n_products), unit='D')
+    return {
+        'product_id': [f'Product_{i+1}' for i in range(n_products)],
+        'inventory_id': [f'INV{i+1:03d}' for i in range(n_products)],
+        'abc_sku': rng.choice(['A', 'B', 'C'], n_products, p=[0.2, 0.3, 0.5]).tolist(),
+        'sellable_inventory': sellable.tolist(),
+        'available_inventory': available.tolist(),
+        'last_order_date': last_order.strftime('%Y-%m-%d').tolist(),
+    }
+
+def create_app(n_products=1000, seed=42, latency_ms=0, failure_rate=0.0, max_page_size=None, handler=None):
+    """aiohttp application serving the paged snapshot.
+
+    ``handler`` replaces the synthetic /inventory handler, e.g. to serve hand-written
+    responses in tests.
+    """
+    columns = create_snapshot_columns(n_products, seed)
+    failures = random.Random(seed)
+
+    async def inventory(request):
+        try:
+            page = int(request.query.get('page', 1))
+            page_size = int(request.query.get('page_size', 1000))
+        except ValueError:
+            raise web.HTTPBadRequest(text='page and page_size must be integers')
+        if page < 1 or page_size < 1:
+            raise web.HTTPBadRequest(text='page and page_size must be positive')
+        if max_page_size:
+            page_size = min(page_size, max_page_size)
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if failure_rate and failures.random() < failure_rate:
+            raise web.HTTPServiceUnavailable(headers={'Retry-After': '0'})
+
+        start = (page - 1) * page_size
+        end = min(start + page_size, n_products)
+        return web.json_response({
+            'page': page,
+            'page_size': page_size,
+            'total_items': n_products,
+            'total_pages': -(-n_products // page_size),
+            'columns': {name: values[start:end] for name, values in columns.items()},
+        })
+
+    async def health(request):
+        return web.json_response({'status': 'ok'})
+
+    app = web.Application()
+    app.router.add_get('/inventory', handler or inventory)
+    app.router.add_get('/health', health)
+    return app
+
+@asynccontextmanager
+async def running_server(host='127.0.0.1', port=0, **app_kwargs):
+    """Run the stand-in server for the duration of an ``async with`` block; yields its base URL.
+
+    ``app_kwargs`` go to ``create_app``; with ``port=0`` the server binds a free port.
+    """
+    runner = web.AppRunner(create_app(**app_kwargs), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    try:
+        yield f'http://{host}:{runner.addresses[0][1]}'
+    finally:
+        await runner.cleanup()
+
+def main(argv=None):
+    """Main function to serve the stand-in inventory endpoint."""
+    parser = argparse.ArgumentParser(description='Serve a synthetic paged inventory endpoint.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--max-page-size', type=int, help='cap on the page size the server hands out')
+    args = parser.parse_args(argv)
+
+    app = create_app(args.products, args.seed, args.latency_ms, args.failure_rate, args.max_page_size)
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
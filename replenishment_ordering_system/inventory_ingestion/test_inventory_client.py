@@ -0,0 +1,104 @@
+"""Tests of the async inventory client against the stand-in server.
+
+    python -m pytest replenishment_ordering_system/inventory_ingestion
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from inventory_client import IngestionError, _retry_delay, fetch_inventory_snapshot
+from stand_in_server import create_snapshot_columns, running_server
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.schema import SchemaError
+
+def fetch_from_server(server_kwargs, **client_kwargs):
+    async def run():
+        async with running_server(**server_kwargs) as url:
+            client_kwargs.setdefault('backoff', 0.001)
+            return await fetch_inventory_snapshot(url, **client_kwargs)
+    return asyncio.run(run())
+
+def assert_matches_server(snapshot, n_products):
+    expected = create_snapshot_columns(n_products)
+    assert len(snapshot) == n_products
+    for column in ('product_id', 'inventory_id', 'abc_sku'):
+        assert snapshot[column].astype(str).tolist() == expected[column]
+    for column in ('sellable_inventory', 'available_inventory'):
+        assert snapshot[column].tolist() == expected[column]
+    assert snapshot['last_order_date'].dt.strftime('%Y-%m-%d').tolist() == expected['last_order_date']
+
+def test_snapshot_matches_server_despite_failures():
+    snapshot = fetch_from_server({'n_products': 2_500, 'failure_rate': 0.2},
+                                 page_size=100, max_connections=8, retries=10)
+    assert_matches_server(snapshot, 2_500)
+
+def test_server_page_size_cap_is_followed():
+    snapshot = fetch_from_server({'n_products': 2_345, 'max_page_size': 500}, page_size=1_000)
+    assert_matches_server(snapshot, 2_345)
+
+def test_non_200_raises():
+    async def run():
+        async with running_server(n_products=10) as url:
+            await fetch_inventory_snapshot(url + '/missing', backoff=0.001)
+    with pytest.raises(IngestionError, match='HTTP 404'):
+        asyncio.run(run())
+
+def test_exhausted_retries_raise():
+    with pytest.raises(IngestionError, match='HTTP 503'):
+        fetch_from_server({'n_products': 10, 'failure_rate': 1.0}, retries=2)
+
+def test_connection_errors_raise_after_retries():
+    async def run():
+        async with running_server(n_products=10) as url:
+            pass
+        # The server is gone, every attempt is refused
+        await fetch_inventory_snapshot(url, retries=1, backoff=0.001)
+    with pytest.raises(IngestionError, match='after 1 retries'):
+        asyncio.run(run())
+
+def test_null_in_integer_column_is_reported():
+    async def handler(request):
+        return web.json_response({
+            'page': 1, 'page_size': 2, 'total_items': 2, 'total_pages': 1,
+            'columns': {'product_id': ['a', 'b'], 'sellable_inventory': [1, None], 'available_inventory': [1, 2]},
+        })
+
+    async def run():
+        async with running_server(handler=handler) as url:
+            await fetch_inventory_snapshot(url, backoff=0.001)
+    with pytest.raises(SchemaError, match='sellable_inventory'):
+        asyncio.run(run())
+
+def test_retry_after_http_date_is_honoured():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            retry_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+            raise web.HTTPServiceUnavailable(headers={'Retry-After': format_datetime(retry_at, usegmt=True)})
+        return web.json_response({
+            'page': 1, 'page_size': 1, 'total_items': 1, 'total_pages': 1,
+            'columns': {'product_id': ['a'], 'sellable_inventory': [3], 'available_inventory': [2]},
+        })
+
+    async def run():
+        async with running_server(handler=handler) as url:
+            return await fetch_inventory_snapshot(url, backoff=0.001)
+    snapshot = asyncio.run(run())
+    assert len(attempts) == 2
+    assert snapshot['sellable_inventory'].tolist() == [3]
+
+def test_retry_delay_parsing():
+    assert _retry_delay(None, 0.5) == 0.5
+    assert _retry_delay('2', 0.5) == 2.0
+    assert _retry_delay('not a date', 0.5) == 0.5
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 <= _retry_delay(in_ten_seconds, 0.5) <= 10
@@ -1,4 +1,13 @@
 import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common import instrumentation
+from common.schema import STOCK_INPUT, STOCK_OUTPUT, apply_schema, attach_settings, integers_for_display, with_settings
+
+# Sample demand is in whole units; print and save these as integers
+WHOLE_UNIT_COLUMNS = ['Daily Demand', 'Daily Sales']
 
 def create_inventory_data():
     """Create the initial inventory data."""
@@ -10,10 +19,12 @@ def create_inventory_data():
         'Review Time': [7, 7, 7],
         'Z-score': [1.96, 1.96, 1.96]  # Placeholder Z-scores for now
     }
-    return pd.DataFrame(data)
+    return apply_schema(pd.DataFrame(data), STOCK_INPUT, copy=False)
 
+@instrumentation.timed(subsystem='replenishment')
 def calculate_basic_inventory_metrics(df, high_z_score=2.56):
     """Calculate basic inventory metrics including cycle stock and safety stock."""
+    instrumentation.count('rows', len(df))
     # Calculate Cycle Stock
     df['Cycle Stock'] = (df['Daily Demand'] * (df['Lead Time'] + df['Review Time'])).round(0)
     
@@ -33,10 +44,12 @@ def calculate_basic_inventory_metrics(df, high_z_score=2.56):
     # Add Final Planning Horizon
     df['Final Planning Horizon (Days)'] = df['Lead Time'] + df['Review Time']
     
-    return df
+    return apply_schema(df, STOCK_OUTPUT)
 
+@instrumentation.timed(subsystem='replenishment')
 def calculate_target_inventory(df, shelf_life_days=22, inventory_cap_percentage=0.7):
     """Calculate target inventory units and weeks with shelf life constraints."""
+    instrumentation.count('rows', len(df))
     days_in_week = 7
     
     # Calculate shelf life in weeks
@@ -68,11 +81,13 @@ def calculate_target_inventory(df, shelf_life_days=22, inventory_cap_percentage=
     df['Final Safety Stock'] = 0  # Remove all safety stock
     df['Final Cycle Stock'] = df['Final Target Inventory Units']  # All remaining is cycle stock
     
-    # Add shelf life columns
-    df['Shelf Life Days'] = shelf_life_days
-    df['Shelf Life Cap'] = inventory_cap_percentage
-    df['Max Shelf Life Days'] = shelf_life_days * inventory_cap_percentage
-    df['Max Shelf Life Weeks'] = (shelf_life_days * inventory_cap_percentage) / days_in_week
+    # Add shelf life settings (once per frame; with_settings turns them into columns)
+    attach_settings(df, **{
+        'Shelf Life Days': shelf_life_days,
+        'Shelf Life Cap': inventory_cap_percentage,
+        'Max Shelf Life Days': shelf_life_days * inventory_cap_percentage,
+        'Max Shelf Life Weeks': (shelf_life_days * inventory_cap_percentage) / days_in_week,
+    })
     
     # Debug: Print the cap calculation
     print(f"\nShelf Life Cap Calculation:")
@@ -81,10 +96,11 @@ def calculate_target_inventory(df, shelf_life_days=22, inventory_cap_percentage=
     print(f"Cap Percentage: {inventory_cap_percentage}")
     print(f"Max Target Weeks: {max_target_weeks:.2f} weeks")
     
-    return df
+    return apply_schema(df, STOCK_OUTPUT)
 
 def print_debug_info(df):
     """Print debugging information for verification."""
+    df = integers_for_display(with_settings(df), WHOLE_UNIT_COLUMNS)
     print("\nTarget Inventory Analysis:")
     print(df[['Product', 'Initial Cycle Stock', 'Initial Safety Stock', 'Initial Target Inventory Units', 
               'Final Target Inventory Units', 'Final Cycle Stock', 'Final Safety Stock', 
@@ -114,7 +130,7 @@ def main():
         'Max Shelf Life Days', 'Max Shelf Life Weeks', 'Daily Sales', 'Daily Demand'
     ]
     
-    df_result = df[final_columns]
+    df_result = integers_for_display(with_settings(df), WHOLE_UNIT_COLUMNS)[final_columns]
     
     # Save results
     output_path = '/Users/christian_hahn/Documents/stock_output_with_shelf_life.csv'